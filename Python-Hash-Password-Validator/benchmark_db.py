@@ -0,0 +1,113 @@
+"""
+Per-operation latency of the vault database functions, before and after the
+pooled connection layer.
+
+"before" reproduces the original pattern: sqlite3.connect, one statement,
+commit and close for every call, on a database in the default rollback-journal
+mode. "after" calls the python_core_hashing functions, which reuse one WAL-mode
+connection per thread; "after (one transaction)" runs the inserts inside a
+single transaction().
+
+Usage:
+    python benchmark_db.py [--ops 2000]
+
+Runs against throw-away databases in a temporary directory; the real vault is
+never touched.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from cryptography.fernet import Fernet
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS passwords (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        website TEXT NOT NULL,
+        username TEXT NOT NULL,
+        encrypted_password TEXT NOT NULL
+    )
+'''
+
+
+def per_op_us(func, count):
+    """Calls func(i) for i in range(count) and returns the mean microseconds per call."""
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def legacy_ops(db_path, encryptor):
+    """The original open/execute/commit/close-per-call implementations."""
+    def connect():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(i):
+        encrypted_pwd = encryptor.encrypt(f"secret-{i}")
+        conn = connect()
+        conn.execute("INSERT INTO passwords (website, username, encrypted_password) VALUES (?, ?, ?)",
+                     (f"site{i}.example", f"user{i}", encrypted_pwd))
+        conn.commit()
+        conn.close()
+
+    def get(i):
+        conn = connect()
+        conn.execute("SELECT encrypted_password FROM passwords WHERE id = ?", (i + 1,)).fetchone()
+        conn.close()
+
+    def delete(i):
+        conn = connect()
+        conn.execute("DELETE FROM passwords WHERE id = ?", (i + 1,))
+        conn.commit()
+        conn.close()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(SCHEMA)
+    conn.close()
+    return add, get, delete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000, help="Operations per measurement")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    work_dir = tempfile.mkdtemp(prefix="vault_bench_")
+    import python_core_hashing as core
+
+    encryptor = core.PasswordEncryptor(Fernet.generate_key())
+    add, get, delete = legacy_ops(os.path.join(work_dir, "legacy.db"), encryptor)
+    core.DB_NAME = os.path.join(work_dir, "pooled.db")
+    core.setup_database()
+
+    results = [
+        ("add_password_entry", per_op_us(add, args.ops),
+         per_op_us(lambda i: core.add_password_entry(encryptor, f"site{i}.example", f"user{i}", f"secret-{i}"),
+                   args.ops)),
+        ("get_encrypted_password_by_id", per_op_us(get, args.ops),
+         per_op_us(lambda i: core.get_encrypted_password_by_id(i + 1), args.ops)),
+        ("delete_password_entry_by_id", per_op_us(delete, args.ops),
+         per_op_us(lambda i: core.delete_password_entry_by_id(i + 1), args.ops)),
+    ]
+    with core.transaction():
+        batched = per_op_us(lambda i: core.add_password_entry(encryptor, f"site{i}.example", f"user{i}", "x"),
+                            args.ops)
+
+    print(f"{args.ops} operations each, mean latency per call")
+    print(f"{'operation':<38} {'before':>12} {'after':>12} {'speedup':>8}")
+    for name, before, after in results:
+        print(f"{name:<38} {before:>9.1f} us {after:>9.1f} us {before / after:>7.1f}x")
+    print(f"{'add_password_entry (one transaction)':<38} {'':>12} {batched:>9.1f} us "
+          f"{results[0][1] / batched:>7.1f}x")
+    core.close_db_connections()
+
+
+if __name__ == "__main__":
+    main()
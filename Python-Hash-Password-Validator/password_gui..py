@@ -1,6 +1,22 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog, ttk
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import bisect
+import string
+import threading
 import python_core_hashing # Import the core logic module
+import vault_bulk # Bulk CSV/JSON import and export
+
+# SQLite's NOCASE collation only folds ASCII letters; sort keys must fold the same way
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+def _sort_key(website, entry_id):
+    """The (website COLLATE NOCASE, id) order of the listing, as a Python sort key."""
+    return (website.translate(_NOCASE), entry_id)
+
+# The list keeps at most this many rows in the Treeview; pages far from the view are evicted
+MAX_LOADED_ROWS = 3 * python_core_hashing.PAGE_SIZE
+
+BULK_FILETYPES = [("CSV files", "*.csv"), ("JSON files", "*.json"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
 
 class PasswordManagerApp:
     def __init__(self, root):
@@ -81,7 +97,7 @@ class PasswordManagerApp:
             return
 
         if python_core_hashing.verify_master_password(entered_pwd): # Use core logic
-            self.encryptor = python_core_hashing.PasswordEncryptor(entered_pwd) # Initialize encryptor
+            self.encryptor = python_core_hashing.get_session_encryptor() # Key derived once during login
             messagebox.showinfo("Success", "Login successful!")
             self.show_main_manager_screen()
         else:
@@ -109,12 +125,25 @@ class PasswordManagerApp:
         self.password_entry.grid(row=2, column=1, padx=5, pady=5)
 
         ttk.Button(add_frame, text="Generate", command=self._generate_and_set_password_action).grid(row=2, column=2, padx=5, pady=5)
-        ttk.Button(add_frame, text="Add Entry", command=self._add_entry_action).grid(row=3, column=1, pady=10)
+        self.add_button = ttk.Button(add_frame, text="Add Entry", command=self._add_entry_action)
+        self.add_button.grid(row=3, column=1, pady=10)
 
         # Middle section for displaying entries
         display_frame = ttk.LabelFrame(self.root, text="Stored Passwords", padding="10")
         display_frame.pack(pady=10, padx=20, fill="both", expand=True)
 
+        # Search box: filters as you type (debounced), using the indexed search in the core module
+        search_frame = ttk.Frame(display_frame)
+        search_frame.pack(fill="x", pady=(0, 5))
+        ttk.Label(search_frame, text="Search:").pack(side="left")
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
+        search_entry.pack(side="left", padx=5)
+        search_entry.bind("<KeyRelease>", self._on_search_changed)
+        self.count_label = ttk.Label(search_frame, text="")
+        self.count_label.pack(side="right")
+        self._search_after_id = None
+
         self.tree = ttk.Treeview(display_frame, columns=("Website", "Username"), show="headings")
         self.tree.heading("Website", text="Website")
         self.tree.heading("Username", text="Username")
@@ -123,9 +152,19 @@ class PasswordManagerApp:
         self.tree.pack(fill="both", expand=True)
 
         # Scrollbar for the Treeview
-        vsb = ttk.Scrollbar(self.tree, orient="vertical", command=self.tree.yview)
-        vsb.pack(side='right', fill='y')
-        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree_scrollbar = ttk.Scrollbar(self.tree, orient="vertical", command=self.tree.yview)
+        self.tree_scrollbar.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled)
+
+        # Only a window of at most MAX_LOADED_ROWS rows is kept in the tree: pages are
+        # loaded as the view nears either end and pages at the other end are evicted
+        self._page_before = None # (website, id) of the first loaded row
+        self._page_after = None # (website, id) of the last loaded row
+        self._has_more_before = False
+        self._has_more_pages = False
+        self._page_pending = False
+        self._row_keys = [] # _sort_key of every loaded row, in tree order
+        self._change_version = 0 # change log version the tree reflects
 
         self.tree.bind("<Double-1>", self._on_tree_double_click) # Double click to show/copy
 
@@ -134,7 +173,17 @@ class PasswordManagerApp:
         action_frame.pack(pady=10, padx=20, fill="x")
 
         ttk.Button(action_frame, text="Refresh List", command=self._load_entries_action).pack(side="left", padx=5)
-        ttk.Button(action_frame, text="Delete Selected", command=self._delete_selected_entry_action).pack(side="right", padx=5)
+        self.lock_button = ttk.Button(action_frame, text="Lock", command=self._lock_action)
+        self.lock_button.pack(side="right", padx=5)
+        self.delete_button = ttk.Button(action_frame, text="Delete Selected", command=self._delete_selected_entry_action)
+        self.delete_button.pack(side="right", padx=5)
+        self.import_button = ttk.Button(action_frame, text="Import...", command=self._import_entries_action)
+        self.import_button.pack(side="left", padx=5)
+        self.export_button = ttk.Button(action_frame, text="Export...", command=self._export_entries_action)
+        self.export_button.pack(side="left", padx=5)
+        # Write actions and Lock (which tears this view down) are disabled while an import/export runs
+        self._job_buttons = [self.add_button, self.delete_button, self.import_button, self.export_button,
+                             self.lock_button]
 
         self._load_entries_action() # Load entries on startup
 
@@ -153,23 +202,148 @@ class PasswordManagerApp:
         self.website_entry.delete(0, tk.END)
         self.username_entry.delete(0, tk.END)
         self.password_entry.delete(0, tk.END)
-        self._load_entries_action()
+        self._apply_changes()
 
     def _load_entries_action(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        entries = python_core_hashing.get_all_password_entries() # Use core logic
-
+        """Reloads the list from the first page, applying the current search text."""
+        self.tree.delete(*self.tree.get_children())
+        self._row_keys = []
+        self._page_before = self._page_after = None
+        self._has_more_before = False
+        self._has_more_pages = True
+        # Taken before reading, so changes made meanwhile are applied (not lost) later
+        self._change_version = python_core_hashing.get_change_version()
+        self._load_next_page()
+
+    def _load_next_page(self):
+        self._page_pending = False
+        if not self._has_more_pages:
+            return
+        entries = python_core_hashing.get_password_entries_page(
+            after=self._page_after, query=self.search_var.get()) # Use core logic
+        top = self._top_row_index()
         for entry in entries:
+            if self.tree.exists(entry['id']):
+                continue # already placed by _apply_changes
             self.tree.insert("", "end", iid=entry['id'], values=(entry['website'], entry['username']))
+            self._row_keys.append(_sort_key(entry['website'], entry['id']))
+        if entries:
+            self._page_after = (entries[-1]['website'], entries[-1]['id'])
+            if self._page_before is None:
+                self._page_before = (entries[0]['website'], entries[0]['id'])
+        self._has_more_pages = len(entries) == python_core_hashing.PAGE_SIZE
+        excess = len(self._row_keys) - MAX_LOADED_ROWS
+        if excess > 0:
+            # Evict from the top and keep the same rows in view
+            children = self.tree.get_children()
+            self.tree.delete(*children[:excess])
+            del self._row_keys[:excess]
+            self._page_before = self._row_keys[0] # the folded website compares the same under NOCASE
+            self._has_more_before = True
+            self._scroll_to_row(top - excess)
+        self._update_count_label()
+
+    def _load_previous_page(self):
+        self._page_pending = False
+        if not self._has_more_before:
+            return
+        entries = python_core_hashing.get_password_entries_page(
+            before=self._page_before, query=self.search_var.get()) # Use core logic
+        top = self._top_row_index()
+        added = 0
+        for entry in entries:
+            if self.tree.exists(entry['id']):
+                continue # already placed by _apply_changes
+            self.tree.insert("", added, iid=entry['id'], values=(entry['website'], entry['username']))
+            self._row_keys.insert(added, _sort_key(entry['website'], entry['id']))
+            added += 1
+        if entries:
+            self._page_before = (entries[0]['website'], entries[0]['id'])
+        self._has_more_before = len(entries) == python_core_hashing.PAGE_SIZE
+        excess = len(self._row_keys) - MAX_LOADED_ROWS
+        if excess > 0:
+            # Evict from the bottom; the next page down is fetched again when needed
+            children = self.tree.get_children()
+            self.tree.delete(*children[-excess:])
+            del self._row_keys[-excess:]
+            self._page_after = self._row_keys[-1]
+            self._has_more_pages = True
+        self._scroll_to_row(top + added)
+        self._update_count_label()
+
+    def _top_row_index(self):
+        """Index of the row at the top of the view."""
+        return round(self.tree.yview()[0] * len(self._row_keys))
+
+    def _scroll_to_row(self, index):
+        if self._row_keys:
+            self.tree.yview_moveto(max(index, 0) / len(self._row_keys))
+
+    def _update_count_label(self):
+        shown = len(self._row_keys)
+        more = self._has_more_before or self._has_more_pages
+        self.count_label.config(text=f"{shown} entries loaded" + (" (scroll for more)" if more else ""))
+
+    def _apply_changes(self):
+        """
+        Applies only the rows inserted, updated or deleted since the tree was last
+        refreshed, using the change log in the core module. Falls back to a full
+        reload if the log no longer covers that range or the batch is very large.
+        """
+        changes = python_core_hashing.get_changes_since(self._change_version, limit=python_core_hashing.PAGE_SIZE)
+        if changes is None:
+            self._load_entries_action()
+            return
+        if not changes:
+            return
+        self._change_version = changes[-1]['version']
+        touched = {change['entry_id'] for change in changes}
+        for entry_id in touched:
+            if self.tree.exists(entry_id):
+                del self._row_keys[self.tree.index(entry_id)]
+                self.tree.delete(entry_id)
+        # Re-read the touched rows that still exist and match the search
+        loaded_from = _sort_key(*self._page_before) if self._page_before is not None else None
+        loaded_until = _sort_key(*self._page_after) if self._page_after is not None else None
+        for entry in python_core_hashing.get_password_entries_by_ids(touched, query=self.search_var.get()):
+            key = _sort_key(entry['website'], entry['id'])
+            if self._has_more_pages and loaded_until is not None and key > loaded_until:
+                continue # belongs to a page below the loaded window
+            if self._has_more_before and loaded_from is not None and key < loaded_from:
+                continue # belongs to a page above the loaded window
+            index = bisect.bisect_left(self._row_keys, key)
+            self._row_keys.insert(index, key)
+            self.tree.insert("", index, iid=entry['id'], values=(entry['website'], entry['username']))
+        self._update_count_label()
+
+    def _on_tree_scrolled(self, first, last):
+        """Updates the scrollbar and fetches a page when the view nears either end of the loaded rows."""
+        self.tree_scrollbar.set(first, last)
+        if self._page_pending:
+            return
+        if self._has_more_pages and float(last) > 0.9:
+            self._page_pending = True
+            self.root.after_idle(self._load_next_page)
+        elif self._has_more_before and float(first) < 0.1:
+            self._page_pending = True
+            self.root.after_idle(self._load_previous_page)
+
+    def _on_search_changed(self, event=None):
+        # Wait until typing pauses before querying
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(250, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        self._load_entries_action()
 
     def _on_tree_double_click(self, event):
         selected_item = self.tree.selection()
         if not selected_item:
             return
 
-        item_id = self.tree.item(selected_item[0])['iid']
+        item_id = selected_item[0] # The item iid is the entry id
         self._show_decrypted_password_action(item_id)
 
     def _show_decrypted_password_action(self, entry_id):
@@ -202,7 +376,61 @@ class PasswordManagerApp:
             item_id = selected_item[0]
             python_core_hashing.delete_password_entry_by_id(item_id) # Use core logic
             messagebox.showinfo("Deleted", "Entry deleted successfully.")
-            self._load_entries_action()
+            self._apply_changes()
+
+    def _lock_action(self):
+        """Forgets the session key and returns to the login screen."""
+        python_core_hashing.lock_session()
+        self.encryptor = None
+        self.show_login_screen()
+
+    def _import_entries_action(self):
+        path = filedialog.askopenfilename(title="Import entries", filetypes=BULK_FILETYPES)
+        if path:
+            self._run_bulk_job("Import", vault_bulk.import_entries, path)
+
+    def _export_entries_action(self):
+        path = filedialog.asksaveasfilename(title="Export entries (passwords in plain text!)",
+                                            defaultextension=".csv", filetypes=BULK_FILETYPES)
+        if path:
+            self._run_bulk_job("Export", vault_bulk.export_entries, path)
+
+    def _run_bulk_job(self, title, job, path):
+        """Runs an import/export on a worker thread and reports rows/s when it is done."""
+        for button in self._job_buttons:
+            button.config(state="disabled")
+        outcome = {}
+
+        def work():
+            try:
+                outcome["result"] = job(self.encryptor, path)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                python_core_hashing.close_thread_connections() # the thread ends; don't leave its connection pooled
+
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+
+        def poll():
+            if not self.import_button.winfo_exists():
+                return # the main view is gone; nothing left to update
+            if worker.is_alive():
+                self.root.after(100, poll)
+                return
+            for button in self._job_buttons:
+                button.config(state="normal")
+            if "error" in outcome:
+                messagebox.showerror(f"{title} Failed", str(outcome["error"]))
+                return
+            result = outcome["result"]
+            if title == "Import":
+                self._apply_changes()
+            messagebox.showinfo(f"{title} Finished",
+                                f"{title}ed {result.rows} entries in {result.seconds:.2f} s "
+                                f"({result.rows_per_s:,.0f} rows/s).\nSkipped: {result.skipped}")
+
+        self.root.after(100, poll)
 
     def _generate_and_set_password_action(self):
         generated_pwd = python_core_hashing.generate_password(length=16, use_digits=True, use_symbols=True, use_uppercase=True, use_lowercase=True) # Use core logic
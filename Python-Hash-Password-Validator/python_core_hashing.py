@@ -1,5 +1,10 @@
 import sqlite3
+import atexit
+import contextlib
+import threading
 import hashlib # Re-import hashlib for PBKDF2
+import hmac
+import time
 import os # Still needed for os.urandom for salt generation
 import base64
 from cryptography.fernet import Fernet, InvalidToken
@@ -11,43 +16,287 @@ import string
 DB_NAME = 'password_manager.db'
 MASTER_KEY_TABLE = 'master_key'
 PASSWORDS_TABLE = 'passwords'
+PASSWORDS_FTS_TABLE = 'passwords_fts'
+PAGE_SIZE = 200 # Entries per page for the paginated listing
+MIN_FTS_QUERY = 3 # The trigram index only matches terms of at least three characters
+CHANGE_LOG_TABLE = 'change_log'
+CHANGE_LOG_KEEP = 10000 # Change log rows kept when the database is opened
 
 # --- Database Utilities ---
+# Pragmas applied to every new connection. WAL lets readers run while a write is
+# in progress; synchronous=NORMAL is safe with WAL (a power cut can lose the last
+# commits but never corrupts the file) and avoids an fsync on every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",  # 8 MB page cache
+    "PRAGMA busy_timeout=5000",
+)
+
+_local = threading.local()  # per-thread {db path: connection} and transaction depth
+_all_connections = []
+_all_connections_lock = threading.Lock()
+_pool_generation = 0  # bumped by close_db_connections so every thread reconnects
+_fts_enabled = {}  # db path -> whether the FTS5 search index exists
+_schema_ready = set()  # db paths setup_database has run on in this process
+_schema_lock = threading.Lock()
+_session_keys = {}  # db path -> Fernet key of the unlocked session (never written to disk)
+
 def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row # Allows accessing columns by name
+    """
+    Returns this thread's long-lived connection to DB_NAME, opening it on first use.
+
+    Connections are reused for the lifetime of the thread instead of being opened
+    and closed per call, so callers must not close them (see close_db_connections).
+    The connection is in autocommit mode: single statements commit on their own,
+    and several statements can share one commit with transaction().
+
+    The first connection to a database in this process creates its schema
+    (setup_database). Nothing is written on import, so processes that import this
+    module without using the vault (e.g. bulk-import workers) never touch it.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None or _local.generation != _pool_generation:
+        connections = _local.connections = {}
+        _local.generation = _pool_generation
+    conn = connections.get(DB_NAME)
+    if conn is None:
+        conn = sqlite3.connect(DB_NAME, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row # Allows accessing columns by name
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        connections[DB_NAME] = conn
+        with _all_connections_lock:
+            _all_connections.append(conn)
+        _ensure_schema()
     return conn
 
+def _ensure_schema():
+    db_name = DB_NAME
+    if db_name in _schema_ready:
+        return
+    with _schema_lock:
+        if db_name not in _schema_ready:
+            setup_database()
+            _schema_ready.add(db_name)
+
+@contextlib.contextmanager
+def transaction():
+    """
+    Runs the enclosed statements in one transaction with one commit.
+
+    Usage:
+        with transaction() as conn:
+            conn.execute(...)
+            conn.execute(...)
+
+    Rolls back if the block raises. Nested transaction() blocks join the
+    outermost one, so functions that use it can be combined into bulk operations.
+    """
+    conn = get_db_connection()
+    depth = getattr(_local, "depth", 0)
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    _local.depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth = depth
+        if depth == 0:
+            conn.execute("ROLLBACK")
+        raise
+    _local.depth = depth
+    if depth == 0:
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+def close_thread_connections():
+    """Closes the calling thread's pooled connections, e.g. when a short-lived worker thread ends."""
+    connections = getattr(_local, "connections", None) or {}
+    _local.connections = {}
+    with _all_connections_lock:
+        for conn in connections.values():
+            if conn in _all_connections:
+                _all_connections.remove(conn)
+    for conn in connections.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+def close_db_connections():
+    """Closes every pooled connection (all threads). Called automatically at exit."""
+    global _pool_generation
+    with _all_connections_lock:
+        _pool_generation += 1
+        connections = list(_all_connections)
+        _all_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+atexit.register(close_db_connections)
+
 def setup_database():
     """Creates the necessary tables if they don't exist."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with transaction() as conn:
+        cursor = conn.cursor()
+
+        # Table for storing the hashed master password and salt (re-added salt column)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {MASTER_KEY_TABLE} (
+                id INTEGER PRIMARY KEY,
+                hashed_master_password TEXT NOT NULL,
+                salt TEXT NOT NULL,
+                kdf TEXT,
+                iterations INTEGER
+            )
+        ''')
+        # Vaults created before the KDF settings were stored get the columns (NULL = legacy scheme)
+        columns = {row['name'] for row in cursor.execute(f"PRAGMA table_info({MASTER_KEY_TABLE})")}
+        for column, column_type in (("kdf", "TEXT"), ("iterations", "INTEGER")):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {MASTER_KEY_TABLE} ADD COLUMN {column} {column_type}")
+
+        # Table for storing encrypted passwords
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {PASSWORDS_TABLE} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                website TEXT NOT NULL,
+                username TEXT NOT NULL,
+                encrypted_password TEXT NOT NULL
+            )
+        ''')
+
+        # Case-insensitive indexes for ordered listing and prefix search
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{PASSWORDS_TABLE}_website "
+                       f"ON {PASSWORDS_TABLE} (website COLLATE NOCASE)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{PASSWORDS_TABLE}_username "
+                       f"ON {PASSWORDS_TABLE} (username COLLATE NOCASE)")
+        _fts_enabled[DB_NAME] = _setup_search_index(cursor)
+        _setup_change_log(cursor)
 
-    # Table for storing the hashed master password and salt (re-added salt column)
+def _setup_change_log(cursor):
+    """Creates the change log that triggers append to on every change of the passwords table."""
     cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS {MASTER_KEY_TABLE} (
-            id INTEGER PRIMARY KEY,
-            hashed_master_password TEXT NOT NULL,
-            salt TEXT NOT NULL
+        CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            operation TEXT NOT NULL
         )
     ''')
+    for operation, row in (("insert", "new"), ("update", "new"), ("delete", "old")):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {CHANGE_LOG_TABLE}_{operation} AFTER {operation.upper()} ON {PASSWORDS_TABLE}
+            BEGIN
+                INSERT INTO {CHANGE_LOG_TABLE} (entry_id, operation) VALUES ({row}.id, '{operation}');
+            END
+        ''')
+    # Keep the log bounded; readers behind the pruned range fall back to a full reload
+    cursor.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE version <= "
+                   f"(SELECT MAX(version) FROM {CHANGE_LOG_TABLE}) - ?", (CHANGE_LOG_KEEP,))
 
-    # Table for storing encrypted passwords
+def _setup_search_index(cursor):
+    """
+    Creates the FTS5 trigram index over website and username, kept in sync by triggers.
+
+    Returns False if this SQLite build has no FTS5/trigram support; searches
+    then fall back to LIKE.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (PASSWORDS_FTS_TABLE,))
+    existed = cursor.fetchone() is not None
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {PASSWORDS_FTS_TABLE} USING fts5(
+                website, username, content='{PASSWORDS_TABLE}', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
     cursor.execute(f'''
-        CREATE TABLE IF NOT EXISTS {PASSWORDS_TABLE} (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            website TEXT NOT NULL,
-            username TEXT NOT NULL,
-            encrypted_password TEXT NOT NULL
-        )
+        CREATE TRIGGER IF NOT EXISTS {PASSWORDS_FTS_TABLE}_insert AFTER INSERT ON {PASSWORDS_TABLE} BEGIN
+            INSERT INTO {PASSWORDS_FTS_TABLE} (rowid, website, username) VALUES (new.id, new.website, new.username);
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {PASSWORDS_FTS_TABLE}_delete AFTER DELETE ON {PASSWORDS_TABLE} BEGIN
+            INSERT INTO {PASSWORDS_FTS_TABLE} ({PASSWORDS_FTS_TABLE}, rowid, website, username)
+            VALUES ('delete', old.id, old.website, old.username);
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {PASSWORDS_FTS_TABLE}_update AFTER UPDATE OF website, username
+        ON {PASSWORDS_TABLE} BEGIN
+            INSERT INTO {PASSWORDS_FTS_TABLE} ({PASSWORDS_FTS_TABLE}, rowid, website, username)
+            VALUES ('delete', old.id, old.website, old.username);
+            INSERT INTO {PASSWORDS_FTS_TABLE} (rowid, website, username) VALUES (new.id, new.website, new.username);
+        END
     ''')
-    conn.commit()
-    conn.close()
+    if not existed:
+        # Index the entries of a vault created before the search index existed
+        cursor.execute(f"INSERT INTO {PASSWORDS_FTS_TABLE} ({PASSWORDS_FTS_TABLE}) VALUES ('rebuild')")
+    return True
 
 # --- Hashing and Encryption Utilities ---
+# One KDF run derives a 32-byte master key from the master password and the stored
+# salt. HMAC-SHA256 with distinct labels splits it into the verifier kept in the
+# database and the Fernet key, which is never stored. Deriving 64 bytes straight
+# from PBKDF2 would run it twice for nothing: a guess can be tested against the
+# verifier alone. Vaults created before this scheme (kdf column NULL) use
+# hash_password/derive_fernet_key and are migrated on the next login.
+KDF_PBKDF2 = 'pbkdf2_sha256'
+KDF_SCRYPT = 'scrypt'
+DEFAULT_KDF = KDF_PBKDF2
+DEFAULT_ITERATIONS = {KDF_PBKDF2: 600000, KDF_SCRYPT: 2 ** 15} # scrypt "iterations" is its cost n
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_MAX_N = 2 ** 20 # highest cost calibrate_iterations picks; needs 1 GiB
+SALT_SIZE = 16
+LEGACY_ITERATIONS = 100000
+
+def derive_master_keys(master_pwd, salt, kdf=DEFAULT_KDF, iterations=None):
+    """
+    Runs the KDF once for a 32-byte master key and returns (verifier, fernet_key)
+    split from it with HMAC.
+
+    Args:
+        master_pwd (str): The master password.
+        salt (bytes): Random per-vault salt.
+        kdf (str): KDF_PBKDF2 or KDF_SCRYPT.
+        iterations (int or None): PBKDF2 iterations or scrypt cost n; the default for kdf if None.
+
+    Returns:
+        tuple: verifier (bytes, 32) and fernet_key (URL-safe base64 bytes for Fernet).
+    """
+    iterations = iterations or DEFAULT_ITERATIONS[kdf]
+    password = master_pwd.encode('utf-8')
+    if kdf == KDF_PBKDF2:
+        master_key = hashlib.pbkdf2_hmac('sha256', password, salt, iterations, dklen=32)
+    elif kdf == KDF_SCRYPT:
+        master_key = hashlib.scrypt(password, salt=salt, n=iterations, r=SCRYPT_R, p=SCRYPT_P,
+                                    maxmem=scrypt_maxmem(iterations), dklen=32)
+    else:
+        raise ValueError(f"Unknown KDF: {kdf}")
+    verifier = hmac.new(master_key, b"verifier", hashlib.sha256).digest()
+    fernet_key = hmac.new(master_key, b"fernet", hashlib.sha256).digest()
+    return verifier, base64.urlsafe_b64encode(fernet_key)
+
+def scrypt_maxmem(n, r=SCRYPT_R, p=SCRYPT_P):
+    """
+    Returns the maxmem hashlib.scrypt needs for cost n: 128 * r * (n + p + 2) bytes
+    plus 1 MiB of slack, clamped below the 2**31 - 1 limit hashlib accepts.
+    """
+    return min(128 * r * (n + p + 2) + 1024 * 1024, 2 ** 31 - 2)
+
 def hash_password(password, salt=None):
-    """Hashes a password using SHA256 with a salt (PBKDF2_HMAC)."""
+    """Legacy verifier: PBKDF2-SHA256 with 100k iterations (vaults created before derive_master_keys)."""
     if salt is None:
         salt = os.urandom(16) # Generate a new 16-byte random salt
     else:
@@ -58,22 +307,23 @@ def hash_password(password, salt=None):
         'sha256',
         password.encode('utf-8'),
         salt,
-        100000 # Number of iterations (higher is more secure but slower)
+        LEGACY_ITERATIONS
     )
     return base64.b64encode(hashed_pwd).decode('utf-8'), base64.b64encode(salt).decode('utf-8')
 
 def derive_fernet_key(master_pwd):
-    """Derives a Fernet encryption key from the master password."""
-    # Use SHA256 hash of the master password as the base for the Fernet key
-    # Fernet keys must be 32 URL-safe base64-encoded bytes.
-    # SHA256 produces 32 bytes, which is perfect.
+    """Legacy encryption key: unsalted SHA-256 of the master password. Only used to migrate old vaults."""
     key_material = hashlib.sha256(master_pwd.encode('utf-8')).digest()
     return base64.urlsafe_b64encode(key_material)
 
 class PasswordEncryptor:
     """Handles encryption and decryption of passwords using Fernet."""
-    def __init__(self, master_pwd):
-        self.key = derive_fernet_key(master_pwd)
+    def __init__(self, key):
+        """
+        Args:
+            key (bytes): URL-safe base64 Fernet key, e.g. from get_session_encryptor() after login.
+        """
+        self.key = key
         self.f = Fernet(self.key)
 
     def encrypt(self, data):
@@ -89,6 +339,28 @@ class PasswordEncryptor:
             # Here, we just return None to indicate failure.
             return None
 
+def calibrate_iterations(target_seconds=0.5, kdf=DEFAULT_KDF):
+    """
+    Returns the KDF work factor that takes about target_seconds on this machine.
+
+    PBKDF2 time is linear in the iteration count, so one timed probe is scaled.
+    scrypt's cost n must be a power of two, so n is doubled until the target is reached.
+    """
+    salt = os.urandom(SALT_SIZE)
+    if kdf == KDF_PBKDF2:
+        probe = 100000
+        start = time.perf_counter()
+        derive_master_keys("calibration", salt, kdf, probe)
+        elapsed = time.perf_counter() - start
+        return max(int(probe * target_seconds / elapsed) // 1000 * 1000, LEGACY_ITERATIONS)
+    n = 2 ** 14
+    while True:
+        start = time.perf_counter()
+        derive_master_keys("calibration", salt, kdf, n)
+        if time.perf_counter() - start >= target_seconds or n >= SCRYPT_MAX_N:
+            return n
+        n *= 2
+
 # --- Password Generator Utility ---
 def generate_password(length=12, use_digits=True, use_symbols=True, use_uppercase=True, use_lowercase=True):
     """Generates a random strong password."""
@@ -112,76 +384,246 @@ def generate_password(length=12, use_digits=True, use_symbols=True, use_uppercas
 
 def check_master_password_exists():
     """Checks if a master password has been set in the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT COUNT(*) FROM {MASTER_KEY_TABLE}")
-    exists = cursor.fetchone()[0] > 0
-    conn.close()
-    return exists
-
-def set_new_master_password(new_pwd):
-    """Sets a new master password in the database."""
-    hashed_pwd, salt = hash_password(new_pwd) # hash_password now returns hash and salt
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    # Store both the hashed password and the salt
-    cursor.execute(f"INSERT INTO {MASTER_KEY_TABLE} (hashed_master_password, salt) VALUES (?, ?)",
-                   (hashed_pwd, salt))
-    conn.commit()
-    conn.close()
+    cursor = get_db_connection().execute(f"SELECT COUNT(*) FROM {MASTER_KEY_TABLE}")
+    return cursor.fetchone()[0] > 0
+
+def _get_master_record():
+    cursor = get_db_connection().execute(
+        f"SELECT id, hashed_master_password, salt, kdf, iterations FROM {MASTER_KEY_TABLE} ORDER BY id LIMIT 1")
+    return cursor.fetchone()
+
+def set_new_master_password(new_pwd, kdf=DEFAULT_KDF, iterations=None):
+    """Sets a new master password in the database (log in with verify_master_password to unlock)."""
+    iterations = iterations or DEFAULT_ITERATIONS[kdf]
+    salt = os.urandom(SALT_SIZE)
+    verifier, _ = derive_master_keys(new_pwd, salt, kdf, iterations)
+    # Store the verifier, the salt and the KDF settings; the key itself is never stored
+    get_db_connection().execute(
+        f"INSERT INTO {MASTER_KEY_TABLE} (hashed_master_password, salt, kdf, iterations) VALUES (?, ?, ?, ?)",
+        (base64.b64encode(verifier).decode('utf-8'), base64.b64encode(salt).decode('utf-8'), kdf, iterations))
 
 def verify_master_password(entered_pwd):
-    """Verifies the entered master password against the stored hash and salt."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT hashed_master_password, salt FROM {MASTER_KEY_TABLE}")
-    master_data = cursor.fetchone()
-    conn.close()
+    """
+    Verifies the entered master password and, if it is correct, unlocks the session.
 
-    if master_data:
-        stored_hash = master_data['hashed_master_password']
-        stored_salt = master_data['salt']
+    The KDF runs once here; the derived encryption key is kept in memory until
+    lock_session(), so get_session_encryptor() needs no further KDF runs. A
+    vault still using the legacy scheme is migrated to the KDF-derived key.
+    """
+    master_data = _get_master_record()
+    if not master_data:
+        return False
 
+    stored_salt = master_data['salt']
+    if master_data['kdf'] is None:
         hashed_entered_pwd, _ = hash_password(entered_pwd, stored_salt) # Use stored_salt for hashing entered_pwd
+        if not hmac.compare_digest(hashed_entered_pwd, master_data['hashed_master_password']):
+            return False
+        _rekey_vault(master_data['id'], derive_fernet_key(entered_pwd), entered_pwd, DEFAULT_KDF,
+                     DEFAULT_ITERATIONS[DEFAULT_KDF])
+        return True
+
+    verifier, key = derive_master_keys(entered_pwd, base64.b64decode(stored_salt),
+                                       master_data['kdf'], master_data['iterations'])
+    if not hmac.compare_digest(base64.b64encode(verifier).decode('utf-8'), master_data['hashed_master_password']):
+        return False
+    _session_keys[DB_NAME] = key
+    return True
+
+def change_kdf_settings(master_pwd, kdf=DEFAULT_KDF, iterations=None):
+    """
+    Re-derives the vault key with new KDF settings (and a new salt) and
+    re-encrypts every entry with it.
+
+    Returns:
+        bool: False if master_pwd is wrong.
+    """
+    if not verify_master_password(master_pwd):
+        return False
+    _rekey_vault(_get_master_record()['id'], _session_keys[DB_NAME], master_pwd, kdf,
+                 iterations or DEFAULT_ITERATIONS[kdf])
+    return True
+
+def _rekey_vault(master_id, old_key, master_pwd, kdf, iterations, batch_size=1000):
+    """Re-encrypts all entries from old_key to a freshly salted KDF key in one transaction."""
+    salt = os.urandom(SALT_SIZE)
+    verifier, new_key = derive_master_keys(master_pwd, salt, kdf, iterations)
+    old_fernet, new_fernet = Fernet(old_key), Fernet(new_key)
+    with transaction() as conn:
+        last_id = 0
+        while True:
+            rows = conn.execute(f"SELECT id, encrypted_password FROM {PASSWORDS_TABLE} WHERE id > ? "
+                                f"ORDER BY id LIMIT ?", (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                try:
+                    plain = old_fernet.decrypt(row['encrypted_password'].encode('utf-8'))
+                except InvalidToken:
+                    continue # not readable with the old key either; left untouched
+                updates.append((new_fernet.encrypt(plain).decode('utf-8'), row['id']))
+            conn.executemany(f"UPDATE {PASSWORDS_TABLE} SET encrypted_password = ? WHERE id = ?", updates)
+            last_id = rows[-1]['id']
+        conn.execute(f"UPDATE {MASTER_KEY_TABLE} SET hashed_master_password = ?, salt = ?, kdf = ?, iterations = ? "
+                     f"WHERE id = ?", (base64.b64encode(verifier).decode('utf-8'),
+                                       base64.b64encode(salt).decode('utf-8'), kdf, iterations, master_id))
+    _session_keys[DB_NAME] = new_key
+
+def get_session_encryptor():
+    """Returns a PasswordEncryptor for the unlocked session, or None if the vault is locked."""
+    key = _session_keys.get(DB_NAME)
+    return PasswordEncryptor(key) if key is not None else None
 
-        return hashed_entered_pwd == stored_hash
-    return False
+def lock_session():
+    """Forgets the cached encryption key; the master password is needed again."""
+    _session_keys.pop(DB_NAME, None)
 
 def add_password_entry(encryptor, website, username, password):
-    """Adds an encrypted password entry to the database."""
+    """Adds an encrypted password entry to the database and returns its id."""
     encrypted_pwd = encryptor.encrypt(password)
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"INSERT INTO {PASSWORDS_TABLE} (website, username, encrypted_password) VALUES (?, ?, ?)",
-                   (website, username, encrypted_pwd))
-    conn.commit()
-    conn.close()
+    cursor = get_db_connection().execute(
+        f"INSERT INTO {PASSWORDS_TABLE} (website, username, encrypted_password) VALUES (?, ?, ?)",
+        (website, username, encrypted_pwd))
+    return cursor.lastrowid
 
 def get_all_password_entries():
     """Retrieves all password entries (website and username) from the database."""
+    cursor = get_db_connection().execute(f"SELECT id, website, username FROM {PASSWORDS_TABLE}")
+    return cursor.fetchall()
+
+def _search_filter(query):
+    """Returns (FROM clause, WHERE conditions, parameters) selecting entries that match query."""
+    query = (query or "").strip()
+    params = []
+    conditions = []
+    source = f"{PASSWORDS_TABLE} AS p"
+    get_db_connection() # sets up the schema, and with it _fts_enabled, on first use
+    if query and len(query) >= MIN_FTS_QUERY and _fts_enabled.get(DB_NAME):
+        source += f" JOIN {PASSWORDS_FTS_TABLE} AS f ON f.rowid = p.id"
+        conditions.append(f"{PASSWORDS_FTS_TABLE} MATCH ?")
+        params.append('"' + query.replace('"', '""') + '"')
+    elif query:
+        # Prefix match for short terms (index-assisted); substring if there is no FTS index
+        pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        if len(query) >= MIN_FTS_QUERY:
+            pattern = "%" + pattern
+        conditions.append("(p.website LIKE ? ESCAPE '\\' OR p.username LIKE ? ESCAPE '\\')")
+        params += [pattern, pattern]
+    return source, conditions, params
+
+def get_password_entries_page(after=None, limit=PAGE_SIZE, query=None, before=None):
+    """
+    Returns one page of entries (id, website, username), ordered by website then id.
+
+    Uses keyset pagination: pass the (website, id) of the last row of the
+    previous page as `after`, so every page costs the same no matter how deep
+    into the vault it is. Passing `before` instead returns the page that ends
+    just above that row (still in ascending order), for scrolling back up.
+
+    Args:
+        after (tuple or None): (website, id) of the last row already shown; None for the first page.
+        limit (int): Maximum number of rows returned.
+        query (str or None): Only entries whose website or username contains this text
+            (case-insensitive). Uses the FTS5 trigram index for terms of MIN_FTS_QUERY
+            characters or more, otherwise an indexed prefix match.
+        before (tuple or None): (website, id) of the first row already shown; not
+            combined with after.
+    """
+    source, conditions, params = _search_filter(query)
+    order = "ASC"
+    # Written so the website index can seek straight to the key
+    if after is not None:
+        conditions.append("p.website COLLATE NOCASE >= ? AND (p.website COLLATE NOCASE > ? OR p.id > ?)")
+        params += [after[0], after[0], after[1]]
+    elif before is not None:
+        conditions.append("p.website COLLATE NOCASE <= ? AND (p.website COLLATE NOCASE < ? OR p.id < ?)")
+        params += [before[0], before[0], before[1]]
+        order = "DESC" # walk the index backwards from the key, then flip the page
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor = get_db_connection().execute(
+        f"SELECT p.id, p.website, p.username FROM {source} {where} "
+        f"ORDER BY p.website COLLATE NOCASE {order}, p.id {order} LIMIT ?", params + [limit])
+    rows = cursor.fetchall()
+    if order == "DESC":
+        rows.reverse()
+    return rows
+
+def get_password_entries_by_ids(entry_ids, query=None):
+    """
+    Returns the entries (id, website, username) with the given ids that still
+    exist and match query (same matching as get_password_entries_page).
+    """
+    entry_ids = list(entry_ids)
+    if not entry_ids:
+        return []
+    source, conditions, params = _search_filter(query)
+    conditions.append(f"p.id IN ({','.join('?' * len(entry_ids))})")
+    cursor = get_db_connection().execute(
+        f"SELECT p.id, p.website, p.username FROM {source} WHERE {' AND '.join(conditions)}",
+        params + entry_ids)
+    return cursor.fetchall()
+
+def get_change_version():
+    """Returns the version of the latest change to the passwords table (0 if none was logged)."""
+    cursor = get_db_connection().execute(f"SELECT COALESCE(MAX(version), 0) FROM {CHANGE_LOG_TABLE}")
+    return cursor.fetchone()[0]
+
+def get_changes_since(version, limit=None):
+    """
+    Returns the changes made after version, oldest first, as rows of
+    (version, entry_id, operation) where operation is 'insert', 'update' or 'delete'.
+
+    Every insert, update and delete on the passwords table is logged by triggers,
+    including ones made by other threads or processes (e.g. a bulk import).
+
+    Returns None if changes after version have already been pruned from the
+    log, or if there are more than limit of them; the caller then has to
+    reload everything. At most limit + 1 rows are read, so a bulk import or a
+    re-key that logged every row is not fetched only to be thrown away.
+    """
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT id, website, username FROM {PASSWORDS_TABLE}")
-    entries = cursor.fetchall()
-    conn.close()
-    return entries
+    oldest = conn.execute(f"SELECT MIN(version) FROM {CHANGE_LOG_TABLE}").fetchone()[0]
+    if oldest is not None and version < oldest - 1:
+        return None
+    query = f"SELECT version, entry_id, operation FROM {CHANGE_LOG_TABLE} WHERE version > ? ORDER BY version"
+    if limit is None:
+        return conn.execute(query, (version,)).fetchall()
+    changes = conn.execute(query + " LIMIT ?", (version, limit + 1)).fetchall()
+    return None if len(changes) > limit else changes
 
 def get_encrypted_password_by_id(entry_id):
     """Retrieves the encrypted password for a given entry ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT encrypted_password FROM {PASSWORDS_TABLE} WHERE id = ?", (entry_id,))
+    cursor = get_db_connection().execute(f"SELECT encrypted_password FROM {PASSWORDS_TABLE} WHERE id = ?",
+                                         (entry_id,))
     encrypted_pwd_data = cursor.fetchone()
-    conn.close()
     return encrypted_pwd_data['encrypted_password'] if encrypted_pwd_data else None
 
 def delete_password_entry_by_id(entry_id):
     """Deletes a password entry from the database by its ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(f"DELETE FROM {PASSWORDS_TABLE} WHERE id = ?", (entry_id,))
-    conn.commit()
-    conn.close()
+    get_db_connection().execute(f"DELETE FROM {PASSWORDS_TABLE} WHERE id = ?", (entry_id,))
+
+if __name__ == "__main__":
+    import argparse
+    import getpass
+
+    parser = argparse.ArgumentParser(description="Vault maintenance commands.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    calibrate = subcommands.add_parser("calibrate", help="Pick the KDF work factor for a target unlock time")
+    calibrate.add_argument("--target-ms", type=float, default=500.0, help="Desired unlock time (default: 500)")
+    calibrate.add_argument("--kdf", choices=(KDF_PBKDF2, KDF_SCRYPT), default=DEFAULT_KDF)
+    calibrate.add_argument("--apply", action="store_true",
+                           help="Re-key the vault with the result (asks for the master password)")
+    args = parser.parse_args()
 
-# Initialize the database when the core module is imported
-setup_database()
+    iterations = calibrate_iterations(args.target_ms / 1000, args.kdf)
+    start = time.perf_counter()
+    derive_master_keys("check", os.urandom(SALT_SIZE), args.kdf, iterations)
+    print(f"{args.kdf}: {iterations} ({(time.perf_counter() - start) * 1000:.0f} ms per unlock on this machine)")
+    if args.apply:
+        if not check_master_password_exists():
+            parser.error("No master password set yet.")
+        if change_kdf_settings(getpass.getpass("Master password: "), args.kdf, iterations):
+            print("Vault re-keyed with the new settings.")
+        else:
+            parser.error("Incorrect master password.")
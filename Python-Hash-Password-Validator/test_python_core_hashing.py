@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+import python_core_hashing
+
+
+class ScryptCostRangeTest(unittest.TestCase):
+    """A vault calibrated to the top of the scrypt range must still unlock."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_db_name = python_core_hashing.DB_NAME
+        python_core_hashing.DB_NAME = os.path.join(self.tmp.name, "vault.db")
+
+    def tearDown(self):
+        python_core_hashing.lock_session()
+        python_core_hashing.close_db_connections()
+        python_core_hashing.DB_NAME = self.saved_db_name
+        self.tmp.cleanup()
+
+    def test_maxmem_stays_below_hashlib_limit(self):
+        self.assertLess(python_core_hashing.scrypt_maxmem(python_core_hashing.SCRYPT_MAX_N), 2 ** 31 - 1)
+        self.assertLess(python_core_hashing.scrypt_maxmem(2 ** 24), 2 ** 31 - 1)
+
+    def test_unlock_at_max_cost(self):
+        n = python_core_hashing.SCRYPT_MAX_N
+        python_core_hashing.set_new_master_password("correct horse", python_core_hashing.KDF_SCRYPT, n)
+        self.assertTrue(python_core_hashing.verify_master_password("correct horse"))
+        self.assertIsNotNone(python_core_hashing.get_session_encryptor())
+
+
+if __name__ == "__main__":
+    unittest.main()
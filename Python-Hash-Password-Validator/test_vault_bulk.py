@@ -0,0 +1,60 @@
+import csv
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+
+import python_core_hashing
+import vault_bulk
+
+
+class VaultBulkTest(unittest.TestCase):
+    """Runs against a throw-away vault in a temporary directory."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_db_name = python_core_hashing.DB_NAME
+        python_core_hashing.DB_NAME = os.path.join(self.tmp.name, "vault.db")
+        self.encryptor = python_core_hashing.PasswordEncryptor(Fernet.generate_key())
+
+    def tearDown(self):
+        python_core_hashing.close_db_connections()
+        python_core_hashing.DB_NAME = self.saved_db_name
+        self.tmp.cleanup()
+
+    def write_csv(self, name, rows, encoding='utf-8'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding=encoding, newline='') as f:
+            csv.writer(f).writerows(rows)
+        return path
+
+    def decrypted_entries(self):
+        return sorted((entry['website'], entry['username'],
+                       self.encryptor.decrypt(python_core_hashing.get_encrypted_password_by_id(entry['id'])))
+                      for entry in python_core_hashing.get_all_password_entries())
+
+    def test_pool_import_with_spawn(self):
+        # Spawned workers re-import python_core_hashing while the parent owns the database
+        rows = [(f"site{i}.example", f"user{i}", f"secret-{i}") for i in range(50)]
+        path = self.write_csv("entries.csv", [vault_bulk.FIELDS] + rows)
+        result = vault_bulk.import_entries(self.encryptor, path, workers=2, batch_size=10,
+                                           mp_context=multiprocessing.get_context("spawn"))
+        self.assertEqual((result.rows, result.skipped), (50, 0))
+        self.assertEqual(self.decrypted_entries(), sorted(rows))
+
+    def test_csv_with_byte_order_mark(self):
+        path = self.write_csv("excel.csv", [vault_bulk.FIELDS, ("a.example", "alice", "pw")], encoding='utf-8-sig')
+        result = vault_bulk.import_entries(self.encryptor, path, workers=1)
+        self.assertEqual((result.rows, result.skipped), (1, 0))
+
+    def test_csv_missing_column(self):
+        path = self.write_csv("bad.csv", [("website", "user", "password"), ("a.example", "alice", "pw")])
+        with self.assertRaisesRegex(ValueError, "username"):
+            vault_bulk.import_entries(self.encryptor, path, workers=1)
+        self.assertEqual(self.decrypted_entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
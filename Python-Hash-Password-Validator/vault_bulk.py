@@ -0,0 +1,238 @@
+"""
+Bulk import and export of vault entries.
+
+Import reads CSV (website,username,password header), JSON (a list of objects
+with those keys) or JSON Lines, encrypts the passwords in a process pool and
+then inserts everything with executemany inside a single transaction, so the
+vault is only locked for the inserts. Export
+streams the vault out in batches with fetchmany, decrypting each batch, so
+memory use does not grow with the vault size.
+
+Usage:
+    python vault_bulk.py import entries.csv [--workers N]
+    python vault_bulk.py export backup.jsonl
+"""
+import argparse
+import csv
+import getpass
+import json
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cryptography.fernet import Fernet, InvalidToken
+
+import python_core_hashing
+
+BATCH_SIZE = 2000
+FIELDS = ("website", "username", "password")
+FORMATS = ("csv", "json", "jsonl")
+
+BulkResult = namedtuple("BulkResult", "rows seconds rows_per_s skipped")
+
+_worker_fernet = None  # set in each worker process by _init_worker
+
+
+def _init_worker(key):
+    global _worker_fernet
+    _worker_fernet = Fernet(key)
+
+
+def _encrypt_batch(rows):
+    """Encrypts the password of each (website, username, password) row in a worker process."""
+    return [(website, username, _worker_fernet.encrypt(password.encode('utf-8')).decode('utf-8'))
+            for website, username, password in rows]
+
+
+def detect_format(path, fmt=None):
+    """Returns "csv", "json" or "jsonl" from fmt or the file extension."""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt == "ndjson":
+        fmt = "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt or path} (use one of {', '.join(FORMATS)})")
+    return fmt
+
+
+def read_entries(path, fmt=None):
+    """
+    Yields (website, username, password) tuples from an import file.
+
+    CSV and JSON Lines are read lazily; a JSON array is parsed in one go.
+    Records that are not objects, or whose three fields are not all non-empty
+    strings, are yielded as None so they can be counted as skipped. A UTF-8
+    byte order mark (Excel's "CSV UTF-8") is ignored.
+
+    Raises:
+        ValueError: The CSV header lacks one of the three columns.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if fmt == "csv":
+            records = csv.DictReader(f)
+            missing = [field for field in FIELDS if field not in (records.fieldnames or ())]
+            if missing:
+                raise ValueError(f"{os.path.basename(path)}: CSV header is missing column(s) {', '.join(missing)} "
+                                 f"(expected {','.join(FIELDS)})")
+        elif fmt == "jsonl":
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = json.load(f)
+        for record in records:
+            if not isinstance(record, dict):
+                yield None
+                continue
+            values = tuple(record.get(field) for field in FIELDS)
+            yield values if all(isinstance(value, str) and value for value in values) else None
+
+
+def _batches(entries, batch_size, counter):
+    batch = []
+    for entry in entries:
+        if entry is None:
+            counter["skipped"] += 1
+            continue
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _encrypt_in_pool(pool, batches, max_pending):
+    # Like pool.map, but only submits max_pending batches ahead instead of queuing the whole file at once
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(_encrypt_batch, batch))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def import_entries(encryptor, path, fmt=None, workers=None, batch_size=BATCH_SIZE, progress_callback=None,
+                   mp_context=None):
+    """
+    Imports entries from a CSV/JSON/JSON Lines file into the vault.
+
+    The file is parsed and encrypted in a process pool first; the write
+    transaction is only opened afterwards, so the vault stays writable for
+    other callers while that runs. All inserts share one transaction: either
+    the whole file is imported or nothing is. The encrypted rows are held in
+    memory until then (roughly 200 bytes per entry).
+
+    Args:
+        encryptor (PasswordEncryptor): Encryptor of the unlocked vault.
+        path (str): File to import.
+        fmt (str or None): "csv", "json" or "jsonl"; taken from the extension if None.
+        workers (int or None): Encryption processes; None uses all cores, 1 encrypts in-process.
+        batch_size (int): Rows per encryption task and executemany call.
+        progress_callback (callable or None): Called with the number of rows imported so far.
+        mp_context (multiprocessing context or None): Start method for the pool; the platform default if None.
+
+    Returns:
+        BulkResult: Rows imported, elapsed seconds, rows/s and rows skipped as incomplete or invalid.
+    """
+    start = time.perf_counter()
+    counter = {"skipped": 0}
+    batches = _batches(read_entries(path, fmt), batch_size, counter)
+    insert = (f"INSERT INTO {python_core_hashing.PASSWORDS_TABLE} "
+              f"(website, username, encrypted_password) VALUES (?, ?, ?)")
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(encryptor.key)
+        encrypted_batches = list(map(_encrypt_batch, batches))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_init_worker,
+                                   initargs=(encryptor.key,))
+        try:
+            encrypted_batches = list(_encrypt_in_pool(pool, batches, max_pending=workers * 2))
+        finally:
+            pool.shutdown(cancel_futures=True)
+    rows = 0
+    with python_core_hashing.transaction() as conn:
+        for encrypted in encrypted_batches:
+            conn.executemany(insert, encrypted)
+            rows += len(encrypted)
+            if progress_callback is not None:
+                progress_callback(rows)
+    seconds = time.perf_counter() - start
+    return BulkResult(rows, seconds, rows / seconds if seconds > 0 else 0.0, counter["skipped"])
+
+
+def export_entries(encryptor, path, fmt=None, batch_size=BATCH_SIZE, progress_callback=None):
+    """
+    Writes every vault entry, decrypted, to a CSV/JSON/JSON Lines file.
+
+    Rows are fetched and decrypted batch_size at a time and written straight
+    out. Entries that cannot be decrypted with this key are skipped.
+
+    Returns:
+        BulkResult: Rows exported, elapsed seconds, rows/s and rows skipped.
+    """
+    fmt = detect_format(path, fmt)
+    start = time.perf_counter()
+    rows = skipped = 0
+    cursor = python_core_hashing.get_db_connection().execute(
+        f"SELECT website, username, encrypted_password FROM {python_core_hashing.PASSWORDS_TABLE} ORDER BY id")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(FIELDS)
+        elif fmt == "json":
+            f.write("[")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for website, username, encrypted_pwd in batch:
+                try:
+                    password = encryptor.f.decrypt(encrypted_pwd.encode('utf-8')).decode('utf-8')
+                except InvalidToken:
+                    skipped += 1
+                    continue
+                if writer is not None:
+                    writer.writerow((website, username, password))
+                else:
+                    record = json.dumps(dict(zip(FIELDS, (website, username, password))))
+                    if fmt == "json":
+                        f.write(",\n" if rows else "\n")
+                    f.write(record if fmt == "json" else record + "\n")
+                rows += 1
+            if progress_callback is not None:
+                progress_callback(rows)
+        if fmt == "json":
+            f.write("\n]\n")
+    seconds = time.perf_counter() - start
+    return BulkResult(rows, seconds, rows / seconds if seconds > 0 else 0.0, skipped)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    parser.add_argument("--workers", type=int, help="Encryption processes for import (default: all cores)")
+    args = parser.parse_args()
+
+    if not python_core_hashing.check_master_password_exists():
+        parser.error("No master password set yet; run the password manager first.")
+    master_pwd = getpass.getpass("Master password: ")
+    if not python_core_hashing.verify_master_password(master_pwd):
+        parser.error("Incorrect master password.")
+    encryptor = python_core_hashing.get_session_encryptor()
+
+    if args.command == "import":
+        result = import_entries(encryptor, args.path, args.format, workers=args.workers)
+        print(f"Imported {result.rows} entries in {result.seconds:.2f} s ({result.rows_per_s:,.0f} rows/s), "
+              f"skipped {result.skipped} incomplete or invalid rows")
+    else:
+        result = export_entries(encryptor, args.path, args.format)
+        print(f"Exported {result.rows} entries in {result.seconds:.2f} s ({result.rows_per_s:,.0f} rows/s), "
+              f"skipped {result.skipped} that could not be decrypted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import time
+from collections import namedtuple
+
+# Level value accepted by compress_file_data/compress_file_parallel to enable adaptive selection.
+ADAPTIVE = "adaptive"
+
+# Number and size of the blocks sampled from the input file.
+SAMPLE_COUNT = 4
+SAMPLE_SIZE = 64 * 1024
+# Data that does not shrink below this ratio (compressed / original) is stored as-is.
+STORE_RATIO = 0.95
+# A higher level is only worth it if it saves at least this many bytes per extra CPU second.
+MIN_BYTES_SAVED_PER_SECOND = 1024 * 1024
+
+LevelChoice = namedtuple("LevelChoice", "level ratio stored")
+
+
+def read_samples(path, count=SAMPLE_COUNT, size=SAMPLE_SIZE):
+    """Reads count blocks of size bytes spread evenly across the file."""
+    file_size = os.path.getsize(path)
+    if file_size <= count * size:
+        offsets = [0]
+        size = file_size
+    else:
+        step = (file_size - size) // (count - 1)
+        offsets = [i * step for i in range(count)]
+    samples = []
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            samples.append(f.read(size))
+    return [sample for sample in samples if sample]
+
+
+def probe_levels(samples, codec, levels):
+    """
+    Compresses the samples at each level.
+
+    Returns:
+        list: (level, ratio, seconds) per level, in the order given.
+    """
+    original = sum(len(sample) for sample in samples)
+    results = []
+    for level in levels:
+        start = time.perf_counter()
+        compressed = sum(len(codec.compress(sample, level)) for sample in samples)
+        results.append((level, compressed / original, time.perf_counter() - start))
+    return results
+
+
+def choose_level(samples, codec):
+    """
+    Picks a level for data that looks like the samples.
+
+    Candidate levels are the codec's presets from fastest to densest. A denser
+    level is chosen only while the bytes it saves per extra CPU second stay above
+    MIN_BYTES_SAVED_PER_SECOND. If even the fastest level barely shrinks the data
+    (already-compressed PDFs, JPEGs, MP4s), the data should be stored instead.
+
+    Returns:
+        LevelChoice: level to use, estimated ratio, and whether to store uncompressed.
+    """
+    original = sum(len(sample) for sample in samples)
+    if not original:
+        return LevelChoice(codec.levels["fast"], 1.0, False)
+
+    levels = sorted(set(codec.levels.values()))
+    results = probe_levels(samples, codec, levels)
+    best_level, best_ratio, best_seconds = results[0]
+    if best_ratio >= STORE_RATIO:
+        return LevelChoice(None, 1.0, True)
+    for level, ratio, seconds in results[1:]:
+        saved = (best_ratio - ratio) * original
+        extra_seconds = max(seconds - best_seconds, 1e-9)
+        if saved / extra_seconds < MIN_BYTES_SAVED_PER_SECOND:
+            break
+        best_level, best_ratio, best_seconds = level, ratio, seconds
+    return LevelChoice(best_level, best_ratio, False)
+
+
+def should_store_block(block, codec):
+    """Quick per-block check: True if a fast pass over the block's start barely shrinks it."""
+    sample = block[:SAMPLE_SIZE]
+    return len(codec.compress(sample, codec.levels["fast"])) >= STORE_RATIO * len(sample)
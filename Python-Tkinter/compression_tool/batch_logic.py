@@ -0,0 +1,127 @@
+import glob
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import block_format
+import codec_registry
+from compress_logic import compress_file_data
+
+# One event is reported per finished file, plus a final event with path=None.
+BatchProgress = namedtuple("BatchProgress",
+                           "path success message files_done files_total bytes_done bytes_total elapsed")
+
+
+def collect_batch_files(source):
+    """
+    Expands a directory (recursively) or a glob pattern into a sorted list of files.
+
+    Args:
+        source (str): Directory path, or a pattern such as "logs/**/*.log".
+    """
+    if os.path.isdir(source):
+        paths = [os.path.join(root, name) for root, _, names in os.walk(source) for name in names]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def is_compressed_file(path):
+    """
+    Returns True if path already looks like output of this tool: it carries a
+    registered codec extension or starts with a block archive or codec magic.
+
+    zlib's two-byte header is left out of the magic check because ordinary
+    files match it too often; .zlib files are still caught by their extension.
+    """
+    extensions = tuple(codec.extension for codec in codec_registry.available_codecs()) + (block_format.EXTENSION,)
+    if path.endswith(extensions):
+        return True
+    with open(path, 'rb') as f:
+        header = f.read(max(len(block_format.MAGIC), codec_registry.DETECT_SIZE))
+    if header.startswith(block_format.MAGIC):
+        return True
+    return any(len(codec.magic) >= 3 and header.startswith(codec.magic)
+               for codec in codec_registry.available_codecs())
+
+
+def batch_output_path(source_path, base_dir, output_dir, extension):
+    """Mirrors source_path's location under base_dir into output_dir and appends the codec extension."""
+    if output_dir is None:
+        return source_path + extension
+    relative = os.path.relpath(source_path, base_dir)
+    return os.path.join(output_dir, relative + extension)
+
+
+def compress_batch(source, output_dir=None, codec="zlib", level=None, workers=None, progress_callback=None,
+                   cache=None):
+    """
+    Compresses every file matched by source on a pool of worker threads.
+
+    Files that are already compressed (see is_compressed_file) are skipped, so
+    running a batch again over its own output folder does not produce .zlib.zlib.
+
+    Args:
+        source (str): Directory or glob pattern, see collect_batch_files.
+        output_dir (str or None): Where compressed files go (keeping the relative
+            layout); None writes each file next to its source.
+        codec (str): Name of a codec in codec_registry.
+        level (int, str or None): Level, preset or "adaptive", as for compress_file_data.
+        workers (int or None): Number of files compressed at once, defaults to the CPU count.
+        progress_callback (callable or None): Called with a BatchProgress after every
+            file and once at the end. It runs on a worker thread, so GUI callers must
+            hand the event over to the Tk thread (see CompressionToolApp).
+        cache (CompressionCache or None): Passed on to compress_file_data.
+
+    Returns:
+        tuple: (success, message) where success means every file was compressed.
+    """
+    matched = collect_batch_files(source)
+    files = [path for path in matched if not is_compressed_file(path)]
+    skipped = len(matched) - len(files)
+    if not files:
+        message = f"No files matched ({skipped} already compressed)" if skipped else "No files matched"
+        if progress_callback:
+            progress_callback(BatchProgress(None, False, message, 0, 0, 0, 0, 0.0))
+        return False, message
+    extension = codec_registry.get_codec(codec).extension
+    base_dir = source if os.path.isdir(source) else os.path.commonpath([os.path.dirname(f) for f in files])
+    sizes = {path: os.path.getsize(path) for path in files}
+    bytes_total = sum(sizes.values())
+    bytes_done = files_done = 0
+    failures = []
+    start = time.perf_counter()
+
+    def compress_one(path):
+        output_path = batch_output_path(path, base_dir, output_dir, extension)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        return compress_file_data(path, output_path, codec=codec, level=level, cache=cache)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(compress_one, path): path for path in files}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                success, message = future.result()
+            except Exception as e:
+                success, message = False, str(e)
+            files_done += 1
+            bytes_done += sizes[path]
+            if not success:
+                failures.append(f"{os.path.basename(path)}: {message}")
+            if progress_callback:
+                progress_callback(BatchProgress(path, success, message, files_done, len(files),
+                                                bytes_done, bytes_total, time.perf_counter() - start))
+
+    elapsed = time.perf_counter() - start
+    summary = (f"Compressed {len(files) - len(failures)}/{len(files)} files, "
+               f"{bytes_total / 1024 ** 2:.1f} MB at {bytes_total / 1024 ** 2 / max(elapsed, 1e-9):.1f} MB/s")
+    if skipped:
+        summary += f", skipped {skipped} already compressed"
+    if progress_callback:
+        progress_callback(BatchProgress(None, not failures, summary, files_done, len(files),
+                                        bytes_done, bytes_total, elapsed))
+    if failures:
+        return False, summary + "\n" + "\n".join(failures)
+    return True, summary
@@ -0,0 +1,84 @@
+"""
+Compares compression throughput of the single-call zlib path against the
+parallel block archive at 1, 2, 4 and 8 workers.
+
+Usage:
+    python benchmark_compression.py [file] [--size-mb 64] [--repeat 3]
+
+Without a file argument, a synthetic, moderately compressible input is generated.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import zlib
+
+from compress_logic import compress_file_parallel
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def make_sample_file(path, size_mb):
+    """Writes size_mb MB of text-like data that compresses to about half its size."""
+    rng = random.Random(1234)
+    words = [bytes(rng.choice(b"abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+             for _ in range(5000)]
+    target = size_mb * 1024 * 1024
+    with open(path, 'wb') as f:
+        written = 0
+        while written < target:
+            line = b" ".join(rng.choice(words) for _ in range(12)) + b"\n"
+            f.write(line)
+            written += len(line)
+
+
+def best_time(func, repeat):
+    """Runs func repeat times and returns the fastest wall-clock time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def single_call(source_path, output_path):
+    """The original compress path: read everything, one zlib.compress call at level 9."""
+    with open(source_path, 'rb') as f_in:
+        compressed = zlib.compress(f_in.read(), level=9)
+    with open(output_path, 'wb') as f_out:
+        f_out.write(compressed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="File to compress (default: generated sample)")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the generated sample")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per configuration (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = args.file
+        if source_path is None:
+            source_path = os.path.join(tmp, "sample.txt")
+            make_sample_file(source_path, args.size_mb)
+        output_path = os.path.join(tmp, "out.bin")
+        size_mb = os.path.getsize(source_path) / (1024 * 1024)
+        print(f"Input: {source_path} ({size_mb:.1f} MB), {os.cpu_count()} CPUs available")
+        print(f"{'mode':<22}{'seconds':>10}{'MB/s':>10}{'ratio':>10}{'speedup':>10}")
+
+        baseline = best_time(lambda: single_call(source_path, output_path), args.repeat)
+        ratio = os.path.getsize(output_path) / max(os.path.getsize(source_path), 1)
+        print(f"{'single zlib.compress':<22}{baseline:>10.2f}{size_mb / baseline:>10.1f}{ratio:>10.3f}{1.0:>10.2f}")
+
+        for workers in WORKER_COUNTS:
+            elapsed = best_time(lambda: compress_file_parallel(source_path, output_path, workers=workers),
+                                args.repeat)
+            ratio = os.path.getsize(output_path) / max(os.path.getsize(source_path), 1)
+            label = f"block, {workers} worker(s)"
+            print(f"{label:<22}{elapsed:>10.2f}{size_mb / elapsed:>10.1f}{ratio:>10.3f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compares the memory cost of three ways of feeding a large file to the compressor:
+
+    read-all   the original path: f.read() of the whole file, one zlib.compress call
+    streaming  compress_file_data reading CHUNK_SIZE bytes objects
+    mmap       compress_file_data(use_mmap=True) passing memoryview slices of a mapping
+
+Each mode runs in a fresh child process so peak RSS is not shared between runs.
+For every mode the benchmark reports wall time, peak RSS, the peak of memory
+allocated by Python objects (tracemalloc), and how many input bytes were copied
+into Python bytes objects.
+
+Usage:
+    python benchmark_mmap.py [file] [--size-gb 1] [--level 1]
+
+Without a file argument a sample file of --size-gb GB is generated (1-4 GB
+is the intended range; --size-mb can be used for a quick run).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+import compress_logic
+from compress_logic import compress_file_data
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+MODES = ("read-all", "streaming", "mmap")
+
+
+def make_sample_file(path, size_bytes):
+    """Writes partly compressible data (random bytes interleaved with repeated text)."""
+    text = b"2024-01-01 12:00:00 INFO request handled in 12ms path=/api/v1/items status=200\n" * 800
+    with open(path, 'wb') as f:
+        written = 0
+        while written < size_bytes:
+            block = os.urandom(16 * 1024) + text
+            f.write(block)
+            written += len(block)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode, source_path, output_path, level):
+    """Runs one mode in this process and prints its measurements as JSON."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "read-all":
+        with open(source_path, 'rb') as f_in:
+            data = f_in.read()
+        with open(output_path, 'wb') as f_out:
+            f_out.write(zlib.compress(data, level))
+        copied = len(data)
+        del data
+    else:
+        copied = 0
+        iter_chunks = compress_logic.iter_chunks
+
+        def counting_iter_chunks(*args, **kwargs):
+            # Counts the input bytes that reach the compressor as bytes objects (memoryview slices are not copies)
+            nonlocal copied
+            for chunk in iter_chunks(*args, **kwargs):
+                if isinstance(chunk, bytes):
+                    copied += len(chunk)
+                yield chunk
+
+        compress_logic.iter_chunks = counting_iter_chunks
+        try:
+            success, message = compress_file_data(source_path, output_path, level=level,
+                                                  use_mmap=(mode == "mmap"))
+        finally:
+            compress_logic.iter_chunks = iter_chunks
+        if not success:
+            raise SystemExit(message)
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_rss_mb(),
+                      "traced_peak_mb": traced_peak / 1024 ** 2, "copied_mb": copied / 1024 ** 2}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="File to compress (default: generated sample)")
+    parser.add_argument("--size-gb", type=float, default=1.0, help="Size of the generated sample in GB")
+    parser.add_argument("--size-mb", type=float, help="Size of the generated sample in MB (overrides --size-gb)")
+    parser.add_argument("--level", type=int, default=1, help="zlib level used by every mode")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.file, args.output, args.level)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = args.file
+        if source_path is None:
+            size_bytes = int(args.size_mb * 1024 ** 2 if args.size_mb else args.size_gb * 1024 ** 3)
+            source_path = os.path.join(tmp, "sample.bin")
+            print(f"Generating {size_bytes / 1024 ** 2:.0f} MB sample...")
+            make_sample_file(source_path, size_bytes)
+        size_mb = os.path.getsize(source_path) / 1024 ** 2
+        print(f"Input: {source_path} ({size_mb:.0f} MB), zlib level {args.level}")
+        print(f"{'mode':<12}{'seconds':>10}{'MB/s':>10}{'peak RSS MB':>14}{'py alloc MB':>14}{'copied MB':>12}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), source_path, "--child", mode,
+                 "--output", os.path.join(tmp, "out.zlib"), "--level", str(args.level)],
+                check=True, capture_output=True, text=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f}"
+            print(f"{mode:<12}{result['seconds']:>10.2f}{size_mb / result['seconds']:>10.1f}{rss:>14}"
+                  f"{result['traced_peak_mb']:>14.1f}{result['copied_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
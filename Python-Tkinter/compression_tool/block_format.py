@@ -0,0 +1,170 @@
+import struct
+import zlib
+from collections import namedtuple
+
+# Layout of a block archive:
+#
+#   header                  MAGIC, format version, codec id, block size
+#   block 0 .. block N-1    each block compressed independently
+#   index                   one entry per block (compressed size, original size, flags,
+#                           CRC-32 of the stored block bytes, CRC-32 of the original data)
+#   footer                  offset of the index, total original length, number of blocks,
+#                           CRC-32 of the index, FOOTER_MAGIC
+#
+# Because every block is independent, blocks can be compressed and inflated
+# in parallel, and the trailing index tells a reader where each block starts.
+# The per-block checksums let an archive be verified without inflating it.
+#
+# Version 1 archives have no checksums or total length:
+#   index entry: compressed size, original size, flags
+#   footer:      offset of the index, number of blocks, FOOTER_MAGIC
+
+MAGIC = b"ZBLK"
+# Block archives are not plain codec streams (zlib.decompress, pigz, ... cannot read
+# them), so they get their own extension whatever codec compressed the blocks
+EXTENSION = ".zblk"
+FOOTER_MAGIC = b"ZIDX"
+VERSION = 2
+
+CODEC_ZLIB = 0
+
+# Block is stored uncompressed (compressing it did not make it smaller).
+FLAG_STORED = 0x01
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+HEADER = struct.Struct("<4sBBI")    # magic, version, codec id, block size
+ENTRY = struct.Struct("<IIBII")     # compressed size, original size, flags, payload crc, original crc
+FOOTER = struct.Struct("<QQII4s")   # index offset, original length, block count, index crc, footer magic
+ENTRY_V1 = struct.Struct("<IIB")
+FOOTER_V1 = struct.Struct("<QI4s")
+
+BlockEntry = namedtuple("BlockEntry", "offset compressed_size original_offset original_size flags "
+                                      "payload_crc original_crc")
+ArchiveInfo = namedtuple("ArchiveInfo", "version codec_id block_size blocks original_size")
+
+
+class BlockFormatError(Exception):
+    """Raised when a block archive is truncated, corrupted, or its header/index is invalid."""
+
+
+def is_block_archive(path):
+    """Returns True if the file at path starts with the block archive magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_header(f_out, block_size, codec_id=CODEC_ZLIB):
+    """Writes the archive header to an open binary file."""
+    f_out.write(HEADER.pack(MAGIC, VERSION, codec_id, block_size))
+
+
+def describe_block(payload, original, flags):
+    """Returns the index entry tuple for a block given its stored bytes and original data."""
+    return len(payload), len(original), flags, zlib.crc32(payload), zlib.crc32(original)
+
+
+def write_index(f_out, entries):
+    """
+    Writes the block index and footer after the last block.
+
+    Args:
+        f_out: Binary file positioned right after the last block.
+        entries (list): Tuple per block, in order, as returned by describe_block.
+    """
+    index_offset = f_out.tell()
+    raw_index = b"".join(ENTRY.pack(*entry) for entry in entries)
+    f_out.write(raw_index)
+    original_length = sum(entry[1] for entry in entries)
+    f_out.write(FOOTER.pack(index_offset, original_length, len(entries), zlib.crc32(raw_index), FOOTER_MAGIC))
+
+
+def read_archive_info(f_in):
+    """
+    Reads the header and trailing index of a block archive.
+
+    Args:
+        f_in: Binary file opened for reading (must be seekable).
+
+    Returns:
+        ArchiveInfo: Header fields plus a BlockEntry per block.
+    """
+    f_in.seek(0)
+    header = f_in.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise BlockFormatError("file is too short to be a block archive")
+    magic, version, codec_id, block_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise BlockFormatError("missing block archive header")
+    if version not in (1, VERSION):
+        raise BlockFormatError(f"unsupported block archive version {version}")
+    entry_struct, footer_struct = (ENTRY, FOOTER) if version == VERSION else (ENTRY_V1, FOOTER_V1)
+
+    file_size = f_in.seek(0, 2)
+    if file_size < HEADER.size + footer_struct.size:
+        raise BlockFormatError("block archive is truncated")
+    f_in.seek(file_size - footer_struct.size)
+    footer = footer_struct.unpack(f_in.read(footer_struct.size))
+    if version == VERSION:
+        index_offset, original_length, block_count, index_crc, footer_magic = footer
+    else:
+        index_offset, block_count, footer_magic = footer
+        original_length = index_crc = None
+    if footer_magic != FOOTER_MAGIC or \
+            index_offset + block_count * entry_struct.size != file_size - footer_struct.size:
+        raise BlockFormatError("block archive index is missing or corrupted")
+
+    f_in.seek(index_offset)
+    raw_index = f_in.read(block_count * entry_struct.size)
+    if index_crc is not None and zlib.crc32(raw_index) != index_crc:
+        raise BlockFormatError("block archive index checksum mismatch")
+    blocks = []
+    offset = HEADER.size
+    original_offset = 0
+    for fields in entry_struct.iter_unpack(raw_index):
+        compressed_size, original_size, flags = fields[:3]
+        payload_crc, original_crc = fields[3:] if version == VERSION else (None, None)
+        blocks.append(BlockEntry(offset, compressed_size, original_offset, original_size, flags,
+                                 payload_crc, original_crc))
+        offset += compressed_size
+        original_offset += original_size
+    if offset != index_offset:
+        raise BlockFormatError("block sizes in the index do not match the file")
+    if original_length is not None and original_offset != original_length:
+        raise BlockFormatError("original length in the footer does not match the index")
+    return ArchiveInfo(version, codec_id, block_size, blocks, original_offset)
+
+
+def check_payload(payload, entry):
+    """Raises BlockFormatError if the stored block bytes do not match the index checksum."""
+    if len(payload) != entry.compressed_size:
+        raise BlockFormatError(f"block at offset {entry.offset} is truncated")
+    if entry.payload_crc is not None and zlib.crc32(payload) != entry.payload_crc:
+        raise BlockFormatError(f"block at offset {entry.offset} checksum mismatch")
+
+
+def inflate_block(payload, entry, codec):
+    """
+    Inflates one block, checking its size and checksums against the index.
+
+    Args:
+        payload (bytes): The block's bytes as stored in the archive.
+        entry (BlockEntry): The block's index entry.
+        codec (codec_registry.Codec): Codec named in the archive header.
+    """
+    check_payload(payload, entry)
+    if entry.flags & FLAG_STORED:
+        data = payload
+    else:
+        decompressor = codec.decompressor()
+        try:
+            data = decompressor.decompress(payload, entry.original_size + 1)
+        except Exception as e:  # zlib.error, lzma.LZMAError, OSError from bz2, ...
+            raise BlockFormatError(f"block at offset {entry.offset} is corrupted: {e}") from e
+        if not decompressor.eof:
+            raise BlockFormatError(f"block at offset {entry.offset} is truncated or too large")
+    if len(data) != entry.original_size:
+        raise BlockFormatError(f"block at offset {entry.offset} has the wrong size")
+    if entry.original_crc is not None and zlib.crc32(data) != entry.original_crc:
+        raise BlockFormatError(f"block at offset {entry.offset} original data checksum mismatch")
+    return data
@@ -0,0 +1,202 @@
+import bz2
+import lzma
+import zlib
+
+# Optional fast codecs, used only when available.
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+try:
+    import lz4.frame as lz4_frame  # pip install lz4
+except ImportError:
+    lz4_frame = None
+
+# Named level presets every codec provides.
+LEVEL_PRESETS = ("fast", "default", "max")
+
+
+class Codec:
+    """
+    Describes one compression codec.
+
+    Every codec writes its own standard stream format, so the first bytes of a
+    compressed file (its magic header) identify the codec. Compressors expose
+    compress()/flush(); decompressors expose decompress(data, max_length),
+    needs_input and eof (the bz2/lzma decompressor interface).
+    """
+
+    def __init__(self, name, codec_id, extension, magic, levels, default_level,
+                 compressor_factory, decompressor_factory, detect=None):
+        """
+        Args:
+            name (str): Name shown in the GUI and used by get_codec.
+            codec_id (int): Identifier stored in block archive headers.
+            extension (str): File extension for compressed files, including the dot.
+            magic (bytes): Bytes every stream of this codec starts with.
+            levels (dict): Maps each name in LEVEL_PRESETS to a codec level.
+            default_level (int): Level used when none is given.
+            compressor_factory (callable): level -> compressor object.
+            decompressor_factory (callable): () -> decompressor object.
+            detect (callable or None): header bytes -> bool, overrides the magic prefix check.
+        """
+        self.name = name
+        self.codec_id = codec_id
+        self.extension = extension
+        self.magic = magic
+        self.levels = levels
+        self.default_level = default_level
+        self._compressor_factory = compressor_factory
+        self._decompressor_factory = decompressor_factory
+        self._detect = detect
+
+    def resolve_level(self, level=None):
+        """Turns None, a preset name or an int into a level for this codec."""
+        if level is None:
+            return self.default_level
+        if isinstance(level, str):
+            if level not in self.levels:
+                raise ValueError(f"Unknown level preset '{level}', expected one of {LEVEL_PRESETS}")
+            return self.levels[level]
+        return level
+
+    def compressor(self, level=None):
+        """Returns a new streaming compressor at the given level or preset."""
+        return self._compressor_factory(self.resolve_level(level))
+
+    def decompressor(self):
+        """Returns a new streaming decompressor."""
+        return self._decompressor_factory()
+
+    def compress(self, data, level=None):
+        """Compresses a whole buffer in one call."""
+        compressor = self.compressor(level)
+        return compressor.compress(data) + compressor.flush()
+
+    def matches(self, header):
+        """Returns True if header (the first bytes of a file) looks like this codec's stream."""
+        if self._detect is not None:
+            return self._detect(header)
+        return header.startswith(self.magic)
+
+    def __repr__(self):
+        return f"Codec({self.name!r})"
+
+
+class _ZlibDecompressor:
+    """Wraps zlib.decompressobj in the bz2/lzma decompressor interface."""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+        self.needs_input = True
+
+    @property
+    def eof(self):
+        return self._obj.eof
+
+    def decompress(self, data, max_length=-1):
+        if self._obj.unconsumed_tail:
+            data = self._obj.unconsumed_tail + data
+        output = self._obj.decompress(data, max(max_length, 0))
+        self.needs_input = not self._obj.unconsumed_tail
+        return output
+
+
+class _Lz4Compressor:
+    """Wraps LZ4FrameCompressor so the frame header comes out of the first compress() call."""
+
+    def __init__(self, level):
+        self._obj = lz4_frame.LZ4FrameCompressor(compression_level=level)
+        self._header = self._obj.begin()
+
+    def compress(self, data):
+        output = self._header + self._obj.compress(data)
+        self._header = b""
+        return output
+
+    def flush(self):
+        output = self._header + self._obj.flush()
+        self._header = b""
+        return output
+
+
+def _is_zlib_header(header):
+    """A zlib stream starts with CMF/FLG bytes: deflate method and a valid header checksum."""
+    return len(header) >= 2 and header[0] & 0x0F == 8 and header[0] >> 4 <= 7 \
+        and (header[0] * 256 + header[1]) % 31 == 0
+
+
+_CODECS = {}
+
+
+def register_codec(codec):
+    """Adds a codec to the registry, replacing any codec with the same name."""
+    _CODECS[codec.name] = codec
+
+
+def available_codecs():
+    """Returns the registered codecs in registration order."""
+    return list(_CODECS.values())
+
+
+def get_codec(name):
+    """Returns the codec registered under name."""
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown codec '{name}', available: {', '.join(_CODECS)}") from None
+
+
+def get_codec_by_id(codec_id):
+    """Returns the codec with the given block archive id, or None."""
+    for codec in _CODECS.values():
+        if codec.codec_id == codec_id:
+            return codec
+    return None
+
+
+def detect_codec(header):
+    """Returns the codec whose magic header matches the given leading bytes, or None."""
+    for codec in _CODECS.values():
+        if codec.matches(header):
+            return codec
+    return None
+
+
+# Bytes needed from the start of a file for detect_codec.
+DETECT_SIZE = 6
+
+register_codec(Codec(
+    "zlib", 0, ".zlib", b"\x78", {"fast": 1, "default": 6, "max": 9},
+    default_level=9,  # the level this tool has always used
+    compressor_factory=lambda level: zlib.compressobj(level=level),
+    decompressor_factory=_ZlibDecompressor,
+    detect=_is_zlib_header,
+))
+register_codec(Codec(
+    "bz2", 1, ".bz2", b"BZh", {"fast": 1, "default": 6, "max": 9},
+    default_level=9,
+    compressor_factory=bz2.BZ2Compressor,
+    decompressor_factory=bz2.BZ2Decompressor,
+))
+register_codec(Codec(
+    "lzma", 2, ".xz", b"\xfd7zXZ\x00", {"fast": 0, "default": 6, "max": 9},
+    default_level=6,
+    compressor_factory=lambda level: lzma.LZMACompressor(preset=level),
+    decompressor_factory=lzma.LZMADecompressor,
+))
+if zstd is not None:
+    register_codec(Codec(
+        "zstd", 3, ".zst", b"\x28\xb5\x2f\xfd", {"fast": 1, "default": 3, "max": 19},
+        default_level=3,
+        compressor_factory=lambda level: zstd.ZstdCompressor(level=level),
+        decompressor_factory=zstd.ZstdDecompressor,
+    ))
+if lz4_frame is not None:
+    register_codec(Codec(
+        "lz4", 4, ".lz4", b"\x04\x22\x4d\x18", {"fast": 0, "default": 9, "max": 16},
+        default_level=0,
+        compressor_factory=_Lz4Compressor,
+        decompressor_factory=lz4_frame.LZ4FrameDecompressor,
+    ))
@@ -1,17 +1,178 @@
-import zlib
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+import adaptive_level
+import block_format
+import codec_registry
+from mapped_input import iter_chunks
 
-def compress_file_data(source_filepath, output_filepath):
+# Size of each block read from the source file. Memory use while compressing
+# stays around this size no matter how large the input is.
+CHUNK_SIZE = 1024 * 1024
+
+CACHE_HIT_MESSAGE = "Served from the compression cache"
+
+
+def compress_file_data(source_filepath, output_filepath, chunk_size=CHUNK_SIZE, codec="zlib", level=None,
+                       use_mmap=False, cache=None):
+    """
+    Compresses a file into a single stream, reading and writing it block by block.
+
+    The output is the codec's standard stream format (with the default zlib
+    codec, identical to zlib.compress(data, level=9)), so decompress_file_data
+    can detect the codec from the first bytes of the file.
+
+    Args:
+        source_filepath (str): Path of the file to compress.
+        output_filepath (str): Path the compressed file is written to.
+        chunk_size (int): Number of bytes read from the source per step.
+        codec (str): Name of a codec in codec_registry.
+        level (int, str or None): Codec level, preset ("fast", "default", "max") or
+            "adaptive" to pick a level by compressing samples of the file.
+        use_mmap (bool): Feed memoryview slices of a memory-mapped source to the
+            compressor instead of copying each chunk into a bytes object.
+        cache (CompressionCache or None): If given, unchanged content compressed
+            with the same settings before is copied from the cache instead.
+
+    Returns:
+        tuple: (success, message). In adaptive mode the message reports the
+        chosen level and the measured compression ratio.
+    """
     try:
         if not os.path.exists(source_filepath):
             return False, "Source File Not Found"
-        with open(source_filepath,'rb') as f_in:
-            original_data = f_in.read()
-            compressed_data = zlib.compress(original_data, level=9)
-        with open(output_filepath, 'wb') as f_out:
-            f_out.write(compressed_data)
+        codec = codec_registry.get_codec(codec)
+        if level != adaptive_level.ADAPTIVE:
+            level = codec.resolve_level(level)
+        if cache is not None:
+            cache_key = cache.make_key(source_filepath, ("stream", codec.name, level))
+            cached_report = cache.fetch(cache_key, output_filepath, os.path.getsize(source_filepath))
+            if cached_report is not None:
+                return True, _cache_hit_message(cached_report)
+        report = ""
+        if level == adaptive_level.ADAPTIVE:
+            choice = adaptive_level.choose_level(adaptive_level.read_samples(source_filepath), codec)
+            if choice.stored:
+                # zlib level 0 writes stored deflate blocks; other codecs have no stored mode
+                level = 0 if codec.name == "zlib" else codec.levels["fast"]
+                report = f"Adaptive: data barely compresses, using {codec.name} level {level}"
+            else:
+                level = choice.level
+                report = f"Adaptive: {codec.name} level {level} chosen (estimated ratio {choice.ratio:.3f})"
+        compressor = codec.compressor(level)
+        with open(source_filepath, 'rb') as f_in, open(output_filepath, 'wb') as f_out:
+            for chunk in iter_chunks(f_in, chunk_size, use_mmap):
+                f_out.write(compressor.compress(chunk))
+            f_out.write(compressor.flush())
 
-        return True,""
+        if report:
+            report += f", measured ratio {_ratio(source_filepath, output_filepath):.3f}"
+        if cache is not None:
+            cache.store(cache_key, output_filepath, report)
+        return True, report
     except Exception as e:
-         return False, f"An error occured during compression, {e}"
\ No newline at end of file
+         return False, f"An error occured during compression, {e}"
+
+
+def compress_file_parallel(source_filepath, output_filepath, workers=None,
+                           block_size=block_format.DEFAULT_BLOCK_SIZE, codec="zlib", level=None,
+                           use_mmap=False, cache=None):
+    """
+    Compresses a file into a block archive using several threads.
+
+    The input is split into independent blocks of block_size bytes which are
+    compressed concurrently (the stdlib codecs release the GIL while they work). Blocks are
+    written in order, followed by an index that lets decompress_file_data
+    inflate them in parallel as well. At most 2 * workers blocks are held in
+    memory at once.
+
+    Args:
+        source_filepath (str): Path of the file to compress.
+        output_filepath (str): Path the block archive is written to.
+        workers (int or None): Number of threads, defaults to the CPU count.
+        block_size (int): Uncompressed size of each block.
+        codec (str): Name of a codec in codec_registry.
+        level (int, str or None): Codec level, preset ("fast", "default", "max") or
+            "adaptive". Adaptive mode picks the level from samples of the file and
+            stores blocks that barely compress without compressing them fully.
+        use_mmap (bool): Hand memoryview slices of a memory-mapped source to the
+            workers instead of reading each block into a bytes object.
+        cache (CompressionCache or None): If given, unchanged content compressed
+            with the same settings before is copied from the cache instead.
+
+    Returns:
+        tuple: (success, message). In adaptive mode the message reports the
+        chosen level, the number of stored blocks and the measured ratio.
+    """
+    try:
+        if not os.path.exists(source_filepath):
+            return False, "Source File Not Found"
+        codec = codec_registry.get_codec(codec)
+        adaptive = level == adaptive_level.ADAPTIVE
+        if cache is not None:
+            settings = ("block", codec.name, level if adaptive else codec.resolve_level(level), block_size)
+            cache_key = cache.make_key(source_filepath, settings)
+            cached_report = cache.fetch(cache_key, output_filepath, os.path.getsize(source_filepath))
+            if cached_report is not None:
+                return True, _cache_hit_message(cached_report)
+        if adaptive:
+            choice = adaptive_level.choose_level(adaptive_level.read_samples(source_filepath), codec)
+            level = codec.levels["fast"] if choice.stored else choice.level
+        else:
+            level = codec.resolve_level(level)
+        workers = workers or os.cpu_count() or 1
+        entries = []
+        with open(source_filepath, 'rb') as f_in, open(output_filepath, 'wb') as f_out, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            block_format.write_header(f_out, block_size, codec.codec_id)
+            pending = deque()
+
+            def write_next_block():
+                payload, entry = pending.popleft().result()
+                f_out.write(payload)
+                entries.append(entry)
+
+            for block in iter_chunks(f_in, block_size, use_mmap):
+                pending.append(pool.submit(_compress_block, block, codec, level, adaptive))
+                if len(pending) >= 2 * workers:
+                    write_next_block()
+            while pending:
+                write_next_block()
+            block_format.write_index(f_out, entries)
+
+        report = ""
+        if adaptive:
+            stored = sum(1 for entry in entries if entry[2] & block_format.FLAG_STORED)
+            report = (f"Adaptive: {codec.name} level {level}, {stored}/{len(entries)} blocks stored, "
+                      f"measured ratio {_ratio(source_filepath, output_filepath):.3f}")
+        if cache is not None:
+            cache.store(cache_key, output_filepath, report)
+        return True, report
+    except Exception as e:
+        return False, f"An error occured during compression, {e}"
+
+
+def _cache_hit_message(report):
+    """Message for a cache hit: the report stored with the entry (level, ratio) plus a note."""
+    return f"{report} ({CACHE_HIT_MESSAGE.lower()})" if report else CACHE_HIT_MESSAGE
+
+
+def _ratio(source_filepath, output_filepath):
+    """Returns compressed size / original size."""
+    return os.path.getsize(output_filepath) / max(os.path.getsize(source_filepath), 1)
+
+
+def _compress_block(block, codec, level, adaptive=False):
+    """
+    Compresses one block, falling back to storing it if that is smaller.
+
+    Returns:
+        tuple: (bytes to write, index entry for block_format.write_index)
+    """
+    if adaptive and adaptive_level.should_store_block(block, codec):
+        return block, block_format.describe_block(block, block, block_format.FLAG_STORED)
+    payload = codec.compress(block, level)
+    if len(payload) >= len(block):
+        return block, block_format.describe_block(block, block, block_format.FLAG_STORED)
+    return payload, block_format.describe_block(payload, block, 0)
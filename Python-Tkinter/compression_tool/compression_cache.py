@@ -0,0 +1,171 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".compression_tool_cache")
+DEFAULT_MAX_BYTES = 1024 ** 3
+HASH_CHUNK_SIZE = 1024 * 1024
+CACHE_SUFFIX = ".cz"
+REPORT_SUFFIX = ".report"  # sidecar holding the compression report of an entry
+
+
+class CompressionCache:
+    """
+    On-disk cache of compressed outputs, keyed by the source content and codec settings.
+
+    A repeat compression of unchanged content becomes a hash of the source plus
+    a file copy. Entries are evicted least-recently-used first once the cache
+    grows past max_bytes; recency survives restarts through file modification
+    times. Safe to share between threads (e.g. batch workers).
+
+    Counters:
+        hits, misses: lookups that found / did not find an entry.
+        bytes_saved: source bytes whose compression was skipped thanks to hits.
+        evictions: entries removed to stay under max_bytes.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # key -> entry size in bytes, least recently used first
+        self._entries = OrderedDict()
+        existing = []
+        for name in os.listdir(cache_dir):
+            if name.endswith(CACHE_SUFFIX):
+                stat = os.stat(os.path.join(cache_dir, name))
+                existing.append((stat.st_mtime, name[:-len(CACHE_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+        self._total_bytes = sum(self._entries.values())
+
+    @staticmethod
+    def make_key(source_filepath, settings):
+        """
+        Builds a cache key from the SHA-256 of the file content and the codec settings.
+
+        Args:
+            source_filepath (str): File that is about to be compressed.
+            settings (tuple): Everything that changes the output, e.g. ("stream", "zlib", 9).
+        """
+        digest = hashlib.sha256()
+        with open(source_filepath, 'rb') as f:
+            while True:
+                chunk = f.read(HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        digest.update(repr(tuple(settings)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key, output_filepath, source_size=0):
+        """
+        Copies the cached output for key to output_filepath.
+
+        Returns:
+            str or None: On a hit, the report stored with the entry ("" if none);
+            None on a miss.
+        """
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            shutil.copyfile(path, output_filepath)
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back (e.g. by another process); treat as a miss
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        try:
+            with open(self._report_path(key), 'r', encoding='utf-8') as f:
+                report = f.read()
+        except FileNotFoundError:
+            report = ""
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += source_size
+        return report
+
+    def store(self, key, compressed_filepath, report=""):
+        """
+        Adds a copy of compressed_filepath to the cache and evicts old entries if needed.
+
+        Args:
+            report (str): Compression report (e.g. the adaptive level and ratio)
+                returned again by fetch on a hit.
+        """
+        size = os.path.getsize(compressed_filepath)
+        if size > self.max_bytes:
+            return
+        if report:
+            with open(self._report_path(key), 'w', encoding='utf-8') as f:
+                f.write(report)
+        else:
+            self._remove_report(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(compressed_filepath, tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_key = next(iter(self._entries))
+                self._forget(old_key)
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+                self._remove_report(old_key)
+
+    def stats(self):
+        """Returns the counters plus the current number and total size of entries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def _report_path(self, key):
+        return os.path.join(self.cache_dir, key + REPORT_SUFFIX)
+
+    def _remove_report(self, key):
+        try:
+            os.remove(self._report_path(key))
+        except FileNotFoundError:
+            pass
@@ -1,11 +1,26 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
+import sys
+import queue
+import threading
 
 # Import the separated logic functions
 # These functions handle the core file compression and decompression operations.
-from compress_logic import compress_file_data
+from compress_logic import compress_file_data, compress_file_parallel
 from decompress_logic import decompress_file_data
+from batch_logic import BatchProgress, compress_batch
+from verify_logic import verify_file_data
+import adaptive_level
+import block_format
+import codec_registry
+
+# Optional event-loop profiler shared by the Tkinter apps (run with TK_PROFILE=1 to enable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tk_event_loop_profiler"))
+try:
+    import event_loop_profiler
+except ImportError:
+    event_loop_profiler = None
 
 class CompressionToolApp:
     def __init__(self, master):
@@ -17,7 +32,7 @@ class CompressionToolApp:
         """
         self.master = master
         master.title("File Compression Tool")
-        master.geometry("500x350")
+        master.geometry("500x540")
         master.resizable(False, False)
         master.configure(bg="#f0f0f0") # Light grey background
 
@@ -37,9 +52,26 @@ class CompressionToolApp:
         tk.Entry(compress_frame, textvariable=self.compress_file_path, width=40, state="readonly").grid(row=0, column=1, pady=5, padx=5)
         tk.Button(compress_frame, text="Browse", command=self.browse_file_to_compress).grid(row=0, column=2, pady=5)
 
+        # Codec and level preset (fast codecs for spooling, dense ones for archival)
+        options_frame = tk.Frame(compress_frame, bg="#ffffff")
+        options_frame.grid(row=1, column=0, columnspan=3, sticky="w")
+        self.codec_name = tk.StringVar(value="zlib")
+        tk.Label(options_frame, text="Codec:", bg="#ffffff").pack(side=tk.LEFT)
+        ttk.Combobox(options_frame, textvariable=self.codec_name, state="readonly", width=8,
+                     values=[codec.name for codec in codec_registry.available_codecs()]).pack(side=tk.LEFT, padx=5)
+        self.level_preset = tk.StringVar(value="max")
+        tk.Label(options_frame, text="Level:", bg="#ffffff").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Combobox(options_frame, textvariable=self.level_preset, state="readonly", width=8,
+                     values=codec_registry.LEVEL_PRESETS + (adaptive_level.ADAPTIVE,)).pack(side=tk.LEFT, padx=5)
+
+        # Block archives are compressed (and later decompressed) on all CPU cores
+        self.use_parallel = tk.BooleanVar(value=False)
+        tk.Checkbutton(compress_frame, text="Use all CPU cores (block archive)", variable=self.use_parallel,
+                       bg="#ffffff").grid(row=2, column=0, columnspan=3, sticky="w")
+
         tk.Button(compress_frame, text="Compress", command=self.compress_file,
                   font=("Arial", 10, "bold"), bg="#4CAF50", fg="white", activebackground="#45a049") \
-            .grid(row=1, column=0, columnspan=3, pady=10)
+            .grid(row=3, column=0, columnspan=3, pady=10)
 
         # --- Decompression Section ---
         decompress_frame = tk.LabelFrame(master, text="Decompress File", padx=15, pady=15, bg="#ffffff", bd=2, relief=tk.GROOVE)
@@ -50,9 +82,30 @@ class CompressionToolApp:
         tk.Entry(decompress_frame, textvariable=self.decompress_file_path, width=40, state="readonly").grid(row=0, column=1, pady=5, padx=5)
         tk.Button(decompress_frame, text="Browse", command=self.browse_file_to_decompress).grid(row=0, column=2, pady=5)
 
-        tk.Button(decompress_frame, text="Decompress", command=self.decompress_file,
+        decompress_buttons = tk.Frame(decompress_frame, bg="#ffffff")
+        decompress_buttons.grid(row=1, column=0, columnspan=3, pady=10)
+        tk.Button(decompress_buttons, text="Decompress", command=self.decompress_file,
                   font=("Arial", 10, "bold"), bg="#2196F3", fg="white", activebackground="#1976D2") \
-            .grid(row=1, column=0, columnspan=3, pady=10)
+            .pack(side=tk.LEFT, padx=5)
+        tk.Button(decompress_buttons, text="Verify", command=self.verify_file,
+                  font=("Arial", 10, "bold"), bg="#607D8B", fg="white", activebackground="#455A64") \
+            .pack(side=tk.LEFT, padx=5)
+
+        # --- Batch Section ---
+        batch_frame = tk.LabelFrame(master, text="Batch Compress (folder or glob)", padx=15, pady=10, bg="#ffffff", bd=2, relief=tk.GROOVE)
+        batch_frame.pack(padx=20, pady=10, fill=tk.X)
+
+        self.batch_source = tk.StringVar()
+        tk.Label(batch_frame, text="Folder/Pattern:", bg="#ffffff").grid(row=0, column=0, sticky="w", pady=5)
+        tk.Entry(batch_frame, textvariable=self.batch_source, width=35).grid(row=0, column=1, pady=5, padx=5)
+        tk.Button(batch_frame, text="Browse", command=self.browse_batch_folder).grid(row=0, column=2, pady=5)
+
+        self.batch_button = tk.Button(batch_frame, text="Compress All", command=self.compress_batch_files,
+                                      font=("Arial", 10, "bold"), bg="#FF9800", fg="white", activebackground="#F57C00")
+        self.batch_button.grid(row=1, column=0, columnspan=3, pady=5)
+
+        # Progress events from batch worker threads; drained on the Tk thread by _poll_batch_events
+        self.batch_events = queue.Queue()
 
         # --- Status Bar ---
         self.status_label = tk.Label(master, text="Ready", bd=1, relief=tk.SUNKEN, anchor=tk.W, bg="#e0e0e0")
@@ -67,13 +120,81 @@ class CompressionToolApp:
             self.compress_file_path.set(filepath)
             self.update_status(f"Selected file for compression: {os.path.basename(filepath)}")
 
+    @staticmethod
+    def _compressed_extensions():
+        """Extensions of the files this tool writes: one per codec plus block archives."""
+        return [codec.extension for codec in codec_registry.available_codecs()] + [block_format.EXTENSION]
+
     def browse_file_to_decompress(self):
         """Opens a file dialog to select the compressed file for decompression."""
-        filepath = filedialog.askopenfilename(filetypes=[("Compressed files", "*.zlib"), ("All files", "*.*")])
+        patterns = " ".join("*" + extension for extension in self._compressed_extensions())
+        filepath = filedialog.askopenfilename(filetypes=[("Compressed files", patterns), ("All files", "*.*")])
         if filepath:
             self.decompress_file_path.set(filepath)
             self.update_status(f"Selected file for decompression: {os.path.basename(filepath)}")
 
+    def browse_batch_folder(self):
+        """Opens a directory dialog to select a folder for batch compression."""
+        folder = filedialog.askdirectory()
+        if folder:
+            self.batch_source.set(folder)
+            self.update_status(f"Selected folder for batch compression: {folder}")
+
+    def compress_batch_files(self):
+        """
+        Starts a batch compression in a background thread so the window stays responsive.
+        Progress events are handed to the Tk thread through a queue polled with master.after.
+        """
+        source = self.batch_source.get().strip()
+        if not source:
+            messagebox.showwarning("No Source", "Please select a folder or enter a glob pattern.")
+            return
+        output_dir = filedialog.askdirectory(title="Select output folder")
+        if not output_dir:
+            self.update_status("Batch compression cancelled.")
+            return
+
+        self.batch_button.config(state=tk.DISABLED)
+        self.update_status(f"Batch compressing '{source}'...")
+        worker = threading.Thread(
+            target=self._run_batch,
+            kwargs=dict(source=source, output_dir=output_dir, codec=self.codec_name.get(),
+                        level=self.level_preset.get(), progress_callback=self.batch_events.put),
+            daemon=True)
+        worker.start()
+        self.master.after(100, self._poll_batch_events)
+
+    def _run_batch(self, **kwargs):
+        """Batch worker thread: an unexpected exception is queued as the final event so polling stops."""
+        try:
+            compress_batch(**kwargs)
+        except Exception as e:
+            self.batch_events.put(BatchProgress(None, False, f"Batch compression failed: {e}", 0, 0, 0, 0, 0.0))
+
+    def _poll_batch_events(self):
+        """Applies queued batch progress events to the status bar (runs on the Tk thread)."""
+        finished = False
+        while True:
+            try:
+                event = self.batch_events.get_nowait()
+            except queue.Empty:
+                break
+            if event.path is None:
+                finished = True
+                self.batch_button.config(state=tk.NORMAL)
+                self.update_status(event.message)
+                if event.success:
+                    messagebox.showinfo("Batch Complete", event.message)
+                else:
+                    messagebox.showerror("Batch Finished With Errors", event.message)
+            else:
+                rate = event.bytes_done / 1024 ** 2 / max(event.elapsed, 1e-9)
+                self.update_status(f"[{event.files_done}/{event.files_total}] {os.path.basename(event.path)} "
+                                   f"- {event.bytes_done / 1024 ** 2:.1f}/{event.bytes_total / 1024 ** 2:.1f} MB "
+                                   f"at {rate:.1f} MB/s")
+        if not finished and self.batch_button["state"] == tk.DISABLED:
+            self.master.after(100, self._poll_batch_events)
+
     def compress_file(self):
         """
         Calls the external compression logic and handles the GUI feedback.
@@ -83,19 +204,29 @@ class CompressionToolApp:
             messagebox.showwarning("No File Selected", "Please select a file to compress.")
             return
 
-        initial_filename = os.path.basename(source_path) + ".zlib"
+        codec = codec_registry.get_codec(self.codec_name.get())
+        if self.use_parallel.get():
+            extension, description = block_format.EXTENSION, f"Block archives ({codec.name} blocks)"
+        else:
+            extension, description = codec.extension, f"Compressed {codec.name.upper()} files"
+        initial_filename = os.path.basename(source_path) + extension
         save_path = filedialog.asksaveasfilename(
-            defaultextension=".zlib",
+            defaultextension=extension,
             initialfile=initial_filename,
-            filetypes=[("Compressed ZLIB files", "*.zlib"), ("All files", "*.*")]
+            filetypes=[(description, "*" + extension), ("All files", "*.*")]
         )
 
         if save_path:
-            self.update_status(f"Compressing '{os.path.basename(source_path)}'...")
-            success, message = compress_file_data(source_path, save_path)
+            self.update_status(f"Compressing '{os.path.basename(source_path)}' with {codec.name}...")
+            level = self.level_preset.get()
+            if self.use_parallel.get():
+                success, message = compress_file_parallel(source_path, save_path, codec=codec.name, level=level)
+            else:
+                success, message = compress_file_data(source_path, save_path, codec=codec.name, level=level)
             if success:
-                messagebox.showinfo("Success", f"File compressed successfully!\nSaved as: {os.path.basename(save_path)}")
-                self.update_status(f"Compressed '{os.path.basename(source_path)}' to '{os.path.basename(save_path)}'")
+                details = f"\n{message}" if message else ""
+                messagebox.showinfo("Success", f"File compressed successfully!\nSaved as: {os.path.basename(save_path)}{details}")
+                self.update_status(message or f"Compressed '{os.path.basename(source_path)}' to '{os.path.basename(save_path)}'")
                 self.compress_file_path.set("") # Clear input path on success
             else:
                 messagebox.showerror("Error", f"Compression failed: {message}")
@@ -113,10 +244,11 @@ class CompressionToolApp:
             return
 
         original_filename = os.path.basename(source_path)
-        if original_filename.endswith(".zlib"):
-            initial_filename = original_filename[:-5] # Remove .zlib
-        else:
-            initial_filename = "decompressed_" + original_filename
+        initial_filename = "decompressed_" + original_filename
+        for extension in self._compressed_extensions():
+            if original_filename.endswith(extension):
+                initial_filename = original_filename[:-len(extension)] # Remove .zlib, .bz2, .zblk, ...
+                break
 
         save_path = filedialog.asksaveasfilename(
             initialfile=initial_filename,
@@ -136,6 +268,23 @@ class CompressionToolApp:
         else:
             self.update_status("Decompression cancelled.")
 
+    def verify_file(self):
+        """
+        Checks the selected compressed file for corruption without writing any output.
+        """
+        source_path = self.decompress_file_path.get()
+        if not source_path:
+            messagebox.showwarning("No File Selected", "Please select a compressed file to verify.")
+            return
+
+        self.update_status(f"Verifying '{os.path.basename(source_path)}'...")
+        success, message = verify_file_data(source_path)
+        if success:
+            messagebox.showinfo("Verified", message)
+        else:
+            messagebox.showerror("Verification Failed", message)
+        self.update_status(message)
+
     def update_status(self, message):
         """
         Updates the text in the status bar at the bottom of the application window.
@@ -150,4 +299,6 @@ class CompressionToolApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = CompressionToolApp(root)
+    if event_loop_profiler is not None:
+        event_loop_profiler.profile_from_env(root)
     root.mainloop()
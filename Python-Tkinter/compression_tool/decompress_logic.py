@@ -1,18 +1,146 @@
-import zlib
 import os
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
+import block_format
+import codec_registry
+from mapped_input import iter_chunks, map_file
 
-def decompress_file_data(source_path, output_filepath):
+# Number of compressed bytes read from the source per step.
+READ_SIZE = 64 * 1024
+# Largest amount of decompressed data produced (and held in memory) per step.
+OUTPUT_CHUNK_SIZE = 1024 * 1024
+# Refuse to write more than this many decompressed bytes (decompression bomb guard).
+# None disables the limit.
+MAX_OUTPUT_SIZE = 16 * 1024 ** 3
+
+
+def decompress_file_data(source_path, output_filepath, output_chunk_size=OUTPUT_CHUNK_SIZE,
+                         max_output_size=MAX_OUTPUT_SIZE, workers=None, use_mmap=False):
+    """
+    Decompresses a compressed stream or a block archive to disk incrementally.
+
+    The codec (zlib, bz2, lzma, ...) is detected from the magic header at the
+    start of the file, see codec_registry.py. Output is produced in pieces of
+    at most output_chunk_size bytes and written as soon as it is inflated, so
+    memory stays bounded. If the output grows past
+    max_output_size, decompression stops and the partial output file is removed.
+    Block archives (see block_format.py) are inflated by several threads.
+
+    Args:
+        source_path (str): Path of the compressed file.
+        output_filepath (str): Path the decompressed file is written to.
+        output_chunk_size (int): Maximum bytes inflated per step.
+        max_output_size (int or None): Maximum total decompressed size in bytes.
+        workers (int or None): Threads used for block archives, defaults to the CPU count.
+        use_mmap (bool): Feed memoryview slices of a memory-mapped source to the
+            decompressor instead of reading the input into bytes objects.
+
+    Returns:
+        tuple: (success, message)
+    """
     try:
         if not os.path.exists(source_path):
             return False, "Compressed File not Found"
+        if block_format.is_block_archive(source_path):
+            return _decompress_block_archive(source_path, output_filepath, max_output_size, workers, use_mmap)
+        with open(source_path, 'rb') as f_in:
+            codec = codec_registry.detect_codec(f_in.read(codec_registry.DETECT_SIZE))
+        if codec is None:
+            return False, "Unrecognized compressed file format"
+        decompressor = codec.decompressor()
+        total_written = 0
+        with open(source_path, 'rb') as f_in, open(output_filepath, 'wb') as f_out:
+            chunks = iter_chunks(f_in, READ_SIZE, use_mmap)
+            while not decompressor.eof:
+                data = next(chunks, b"") if decompressor.needs_input else b""
+                chunk = _decompress_chunk(decompressor, data, output_chunk_size)
+                if not data and not chunk:
+                    break
+                total_written += len(chunk)
+                if max_output_size is not None and total_written > max_output_size:
+                    raise _OutputLimitExceeded(max_output_size)
+                f_out.write(chunk)
+        if not decompressor.eof:
+            _remove_partial(output_filepath)
+            return False, f"Invalid {codec.name} compressed file or corrupted data: unexpected end of stream"
+        return True, ""
+    except _OutputLimitExceeded as e:
+        _remove_partial(output_filepath)
+        return False, f"Decompressed data exceeds the limit of {e.limit} bytes, aborted"
+    except _CorruptData as e:
+        _remove_partial(output_filepath)
+        return False, f"Invalid {codec.name} compressed file or corrupted data: {e}"
+    except Exception as e:
+        return False, f"An error occurred during decompression: {e}"
+
+
+def _decompress_block_archive(source_path, output_filepath, max_output_size, workers, use_mmap):
+    """Inflates the blocks of a block archive in parallel, writing them in order."""
+    workers = workers or os.cpu_count() or 1
+    try:
         with open(source_path, 'rb') as f_in:
-            compressed_data = f_in.read()
-        decompressed_data = zlib.decompress(compressed_data)
-        with open(output_filepath, 'wb') as f_out:
-            f_out.write(decompressed_data)
+            info = block_format.read_archive_info(f_in)
+            codec = codec_registry.get_codec_by_id(info.codec_id)
+            if codec is None:
+                return False, f"Unsupported codec id {info.codec_id} in block archive"
+            if max_output_size is not None and info.original_size > max_output_size:
+                return False, f"Decompressed data exceeds the limit of {max_output_size} bytes, aborted"
+            with open(output_filepath, 'wb') as f_out, ThreadPoolExecutor(max_workers=workers) as pool, \
+                    _mapped_or_none(f_in, use_mmap) as view:
+                pending = deque()
+                for entry in info.blocks:
+                    if view is not None:
+                        payload = view[entry.offset:entry.offset + entry.compressed_size]
+                    else:
+                        f_in.seek(entry.offset)
+                        payload = f_in.read(entry.compressed_size)
+                    pending.append(pool.submit(block_format.inflate_block, payload, entry, codec))
+                    if len(pending) >= 2 * workers:
+                        f_out.write(pending.popleft().result())
+                while pending:
+                    f_out.write(pending.popleft().result())
         return True, ""
-    except zlib.error as e:
-        return False, f"Invalid zlib compressed file or corrupted data: {e}"
+    except block_format.BlockFormatError as e:
+        _remove_partial(output_filepath)
+        return False, f"Invalid block archive or corrupted data: {e}"
     except Exception as e:
+        _remove_partial(output_filepath)
         return False, f"An error occurred during decompression: {e}"
+
+
+@contextmanager
+def _mapped_or_none(f_in, use_mmap):
+    """Yields a memoryview of the mapped file when use_mmap is set, otherwise None."""
+    if not use_mmap:
+        yield None
+        return
+    with map_file(f_in) as view:
+        yield view
+
+
+def _decompress_chunk(decompressor, data, max_length):
+    """Calls decompressor.decompress, turning codec-specific data errors into _CorruptData."""
+    try:
+        return decompressor.decompress(data, max_length)
+    except Exception as e:  # zlib.error, lzma.LZMAError, OSError from bz2, EOFError, ...
+        raise _CorruptData(e) from e
+
+
+class _CorruptData(Exception):
+    pass
+
+
+class _OutputLimitExceeded(Exception):
+    def __init__(self, limit):
+        super().__init__(limit)
+        self.limit = limit
+
+
+def _remove_partial(path):
+    """Removes a partially written output file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
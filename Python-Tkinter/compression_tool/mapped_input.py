@@ -0,0 +1,58 @@
+import mmap
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def map_file(f_in):
+    """
+    Maps an open binary file read-only and yields a memoryview of its contents.
+
+    Slices of the view reference the page cache directly, so handing them to a
+    compressor avoids copying the file into Python bytes objects.
+    """
+    size = os.fstat(f_in.fileno()).st_size
+    if size == 0:
+        # mmap cannot map empty files
+        yield memoryview(b"")
+        return
+    mapped = mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            pass  # a slice is still referenced; the mapping is released together with it
+
+
+def iter_chunks(f_in, chunk_size, use_mmap=False):
+    """
+    Yields the contents of an open binary file in pieces of chunk_size bytes.
+
+    With use_mmap the pieces are zero-copy memoryview slices of a mapping of the
+    file; otherwise they are bytes returned by f_in.read(chunk_size). Mapped
+    pages that have been handed out are dropped from the process's resident set
+    once the next piece is requested (they stay in the OS page cache), so RSS
+    does not grow with the file size.
+    """
+    if use_mmap:
+        with map_file(f_in) as view:
+            # An empty file is not mapped at all (see map_file), so there is nothing to advise
+            release_pages = isinstance(view.obj, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED") \
+                and chunk_size % mmap.PAGESIZE == 0
+            if release_pages and hasattr(mmap, "MADV_SEQUENTIAL"):
+                view.obj.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, len(view), chunk_size):
+                yield view[offset:offset + chunk_size]
+                if release_pages:
+                    # Safe even if a worker still reads the slice: the pages fault back in from the cache
+                    view.obj.madvise(mmap.MADV_DONTNEED, offset, min(chunk_size, len(view) - offset))
+        return
+    while True:
+        chunk = f_in.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
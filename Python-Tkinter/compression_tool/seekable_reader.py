@@ -0,0 +1,108 @@
+import bisect
+import io
+
+import block_format
+import codec_registry
+
+# Restart interval recommended for archives that will be read randomly: a
+# read inflates at most one extra block on each side of the requested range.
+SEEKABLE_BLOCK_SIZE = 256 * 1024
+
+
+class BlockArchiveReader(io.RawIOBase):
+    """
+    Read-only, seekable file object over the original data of a block archive.
+
+    Every block of a block archive is an independent restart point and the
+    trailing index maps original offsets to blocks, so read(n) after seek(pos)
+    only inflates the blocks overlapping [pos, pos + n). The most recently
+    inflated block is cached, so sequential small reads inflate each block once.
+
+    Usage:
+        with BlockArchiveReader("huge.log.zblk") as reader:
+            reader.seek(5 * 1024 ** 3)
+            data = reader.read(4096)
+
+    Archives for random access are best written with a small block size, e.g.
+    compress_file_parallel(src, dst, block_size=SEEKABLE_BLOCK_SIZE).
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self._file = open(path, 'rb')
+        try:
+            self._info = block_format.read_archive_info(self._file)
+        except Exception:
+            self._file.close()
+            raise
+        self._codec = codec_registry.get_codec_by_id(self._info.codec_id)
+        if self._codec is None:
+            self._file.close()
+            raise block_format.BlockFormatError(f"unsupported codec id {self._info.codec_id}")
+        self._starts = [entry.original_offset for entry in self._info.blocks]
+        self._position = 0
+        self._cached_index = None
+        self._cached_data = b""
+        self.blocks_inflated = 0  # for measuring the cost of reads
+
+    @property
+    def size(self):
+        """Total size of the original (uncompressed) data."""
+        return self._info.original_size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self._position < self.size:
+            index = bisect.bisect_right(self._starts, self._position) - 1
+            data = self._block_data(index)
+            start = self._position - self._starts[index]
+            count = min(len(data) - start, len(view) - written)
+            view[written:written + count] = data[start:start + count]
+            written += count
+            self._position += count
+        return written
+
+    def read_range(self, offset, length):
+        """Returns up to length bytes starting at original offset (moves the position)."""
+        self.seek(offset)
+        return self.read(length)
+
+    def _block_data(self, index):
+        if index != self._cached_index:
+            entry = self._info.blocks[index]
+            self._file.seek(entry.offset)
+            self._cached_data = block_format.inflate_block(self._file.read(entry.compressed_size),
+                                                           entry, self._codec)
+            self._cached_index = index
+            self.blocks_inflated += 1
+        return self._cached_data
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+            self._cached_data = b""
+        super().close()
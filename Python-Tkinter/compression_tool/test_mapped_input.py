@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from compress_logic import compress_file_data, compress_file_parallel
+from decompress_logic import decompress_file_data
+from mapped_input import iter_chunks
+
+
+class EmptyFileMmapTest(unittest.TestCase):
+    """Zero-byte inputs cannot be mapped; the mmap path must still handle them."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "empty.bin")
+        open(self.source, 'wb').close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_chunks_yields_nothing(self):
+        with open(self.source, 'rb') as f_in:
+            self.assertEqual(list(iter_chunks(f_in, 1024 * 1024, use_mmap=True)), [])
+
+    def test_round_trip(self):
+        for compress in (compress_file_data, compress_file_parallel):
+            with self.subTest(compress=compress.__name__):
+                compressed = os.path.join(self.tmp.name, compress.__name__ + ".zlib")
+                restored = os.path.join(self.tmp.name, compress.__name__ + ".out")
+                success, message = compress(self.source, compressed, use_mmap=True)
+                self.assertTrue(success, message)
+                success, message = decompress_file_data(compressed, restored, use_mmap=True)
+                self.assertTrue(success, message)
+                with open(restored, 'rb') as f:
+                    self.assertEqual(f.read(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import block_format
+import codec_registry
+from decompress_logic import READ_SIZE, OUTPUT_CHUNK_SIZE
+
+
+def verify_file_data(source_path, deep=False, workers=None):
+    """
+    Checks a compressed file for corruption without writing any output.
+
+    For block archives the stored bytes of every block are checked against the
+    CRC-32 values in the index, on several threads (zlib.crc32 releases the
+    GIL), so the check runs at close to disk read speed. With deep=True every
+    block is also inflated in memory and the original data checksums and length
+    are compared. Single-stream files (.zlib, .bz2, .xz, ...) and version 1
+    block archives carry no block checksums; they are inflated and discarded,
+    relying on the codec's own stream checksum.
+
+    Args:
+        source_path (str): Path of the compressed file.
+        deep (bool): Also inflate block archives and check the original data.
+        workers (int or None): Threads used for block archives, defaults to the CPU count.
+
+    Returns:
+        tuple: (success, message)
+    """
+    try:
+        if not os.path.exists(source_path):
+            return False, "Compressed File not Found"
+        if block_format.is_block_archive(source_path):
+            return _verify_block_archive(source_path, deep, workers)
+        return _verify_stream(source_path)
+    except Exception as e:
+        return False, f"An error occurred during verification: {e}"
+
+
+def verify_files(paths, deep=False, workers=None):
+    """
+    Verifies many files, several at a time, e.g. for a nightly archive check.
+
+    Returns:
+        list: (path, success, message) per file, in the order given.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Blocks inside each file are already checked in parallel, so one thread per file is enough there
+        results = pool.map(lambda path: verify_file_data(path, deep, workers=1), paths)
+        return [(path, success, message) for path, (success, message) in zip(paths, results)]
+
+
+def _verify_block_archive(source_path, deep, workers):
+    workers = workers or os.cpu_count() or 1
+    with open(source_path, 'rb') as f_in:
+        try:
+            info = block_format.read_archive_info(f_in)
+        except block_format.BlockFormatError as e:
+            return False, f"Invalid block archive: {e}"
+        codec = codec_registry.get_codec_by_id(info.codec_id)
+        if codec is None:
+            return False, f"Unsupported codec id {info.codec_id} in block archive"
+        if info.version < block_format.VERSION:
+            deep = True  # no block checksums to compare against
+        check = (lambda payload, entry: block_format.inflate_block(payload, entry, codec)) if deep \
+            else block_format.check_payload
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for entry in info.blocks:
+                    f_in.seek(entry.offset)
+                    pending.append(pool.submit(check, f_in.read(entry.compressed_size), entry))
+                    if len(pending) >= 2 * workers:
+                        pending.popleft().result()
+                while pending:
+                    pending.popleft().result()
+        except block_format.BlockFormatError as e:
+            return False, f"Corrupted block archive: {e}"
+    mode = "inflated and checked" if deep else "checksums verified"
+    return True, f"OK: {len(info.blocks)} blocks {mode}, {info.original_size} bytes original"
+
+
+def _verify_stream(source_path):
+    with open(source_path, 'rb') as f_in:
+        codec = codec_registry.detect_codec(f_in.read(codec_registry.DETECT_SIZE))
+        if codec is None:
+            return False, "Unrecognized compressed file format"
+        f_in.seek(0)
+        decompressor = codec.decompressor()
+        total = 0
+        try:
+            while not decompressor.eof:
+                data = f_in.read(READ_SIZE) if decompressor.needs_input else b""
+                chunk = decompressor.decompress(data, OUTPUT_CHUNK_SIZE)
+                if not data and not chunk:
+                    break
+                total += len(chunk)
+        except Exception as e:  # zlib.error, lzma.LZMAError, OSError from bz2, ...
+            return False, f"Corrupted {codec.name} stream: {e}"
+    if not decompressor.eof:
+        return False, f"Corrupted {codec.name} stream: unexpected end of stream"
+    return True, f"OK: {codec.name} stream checksum verified, {total} bytes original"
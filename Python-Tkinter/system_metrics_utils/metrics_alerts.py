@@ -0,0 +1,226 @@
+import logging
+import operator
+import re
+import threading
+from collections import deque, namedtuple
+
+from metrics_history import SNAPSHOT_FIELDS
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+AlertEvent = namedtuple("AlertEvent", "rule state value timestamp message")  # state: "firing" or "resolved"
+
+_RULE_PATTERN = re.compile(
+    r"^\s*(?P<metric>\w+)\s*(?P<op>>=|<=|>|<)\s*(?P<threshold>[\d.]+)\s*%?"
+    r"(?:\s+for\s+(?P<duration>[\d.]+)\s*(?P<unit>s|m|min)?)?\s*$")
+
+
+class AlertRule:
+    """
+    One threshold on a sampled metric, e.g. "cpu > 90 for 30s".
+
+    The rule is breached when the metric compares true against threshold. With
+    a duration, it fires only once the condition has held for that long
+    ("sustained", every sample breaching) or once the mean over that window
+    breaches ("average"). After firing it resolves only when the value crosses
+    clear_threshold the other way (hysteresis), and it does not fire again
+    within cooldown seconds of the previous firing.
+
+    Each sample is handled in O(1): sustained rules keep the time the current
+    breach started, average rules keep a running sum over a deque.
+    """
+
+    def __init__(self, name, metric, op, threshold, duration=0.0, clear_threshold=None,
+                 cooldown=60.0, mode="sustained"):
+        """
+        Args:
+            name (str): Shown in alerts and logs.
+            metric (str or callable): A metrics_history.SNAPSHOT_FIELDS name, or snapshot -> float.
+            op (str): ">", ">=", "<" or "<=".
+            threshold (float): Value that breaches the rule.
+            duration (float): Seconds the breach must last before firing.
+            clear_threshold (float or None): Value the metric must get back past to resolve;
+                defaults to threshold (no hysteresis).
+            cooldown (float): Minimum seconds between two firings.
+            mode (str): "sustained" or "average".
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        if mode not in ("sustained", "average"):
+            raise ValueError(f"Unknown mode: {mode}")
+        self.name = name
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.duration = duration
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.cooldown = cooldown
+        self.mode = mode
+        self._read = SNAPSHOT_FIELDS[metric] if isinstance(metric, str) else metric
+        self._compare = OPERATORS[op]
+        self.reset()
+
+    @classmethod
+    def parse(cls, text, name=None, **kwargs):
+        """
+        Builds a rule from text such as "cpu > 90 for 30s", "disk > 95%" or "memory >= 80 for 2m".
+
+        Extra keyword arguments (clear_threshold, cooldown, mode) are passed on.
+        """
+        match = _RULE_PATTERN.match(text)
+        if not match:
+            raise ValueError(f"Cannot parse alert rule: {text!r}")
+        duration = float(match.group("duration") or 0)
+        if match.group("unit") in ("m", "min"):
+            duration *= 60
+        return cls(name or text.strip(), match.group("metric"), match.group("op"),
+                   float(match.group("threshold")), duration=duration, **kwargs)
+
+    def reset(self):
+        """Forgets all state (breach timers, window, firing status)."""
+        self.firing = False
+        self.last_fired = None
+        self._breach_since = None
+        self._window = deque()  # (timestamp, value), average mode only
+        self._window_sum = 0.0
+        self._first_timestamp = None
+
+    def _cleared(self, value):
+        # Strictly past clear_threshold the other way, e.g. value < clear for a ">" rule
+        return not self._compare(value, self.clear_threshold) and value != self.clear_threshold
+
+    def evaluate(self, snapshot):
+        """
+        Feeds one snapshot to the rule.
+
+        Returns:
+            AlertEvent or None: An event when the rule starts firing or resolves.
+        """
+        timestamp = snapshot["timestamp"]
+        value = float(self._read(snapshot))
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+        if self.mode == "average":
+            self._window.append((timestamp, value))
+            self._window_sum += value
+            while self._window and self._window[0][0] < timestamp - self.duration:
+                self._window_sum -= self._window.popleft()[1]
+            observed = self._window_sum / len(self._window)
+        else:
+            observed = value
+
+        if self.firing:
+            if self._cleared(observed):
+                self.firing = False
+                self._breach_since = None
+                return AlertEvent(self.name, "resolved", observed, timestamp,
+                                  f"{self.name} resolved ({self._describe(observed)})")
+            return None
+
+        if not self._compare(observed, self.threshold):
+            self._breach_since = None
+            return None
+        if self._breach_since is None:
+            self._breach_since = timestamp
+        if self.mode == "sustained" and timestamp - self._breach_since < self.duration:
+            return None
+        if self.mode == "average" and timestamp - self._first_timestamp < self.duration:
+            return None  # not a full window of samples yet
+        if self.last_fired is not None and timestamp - self.last_fired < self.cooldown:
+            return None
+        self.firing = True
+        self.last_fired = timestamp
+        return AlertEvent(self.name, "firing", observed, timestamp,
+                          f"{self.name} ({self._describe(observed)})")
+
+    def _describe(self, value):
+        metric = self.metric if isinstance(self.metric, str) else "value"
+        return f"{metric}={value:.1f}"
+
+
+class AlertEngine:
+    """
+    Evaluates a set of AlertRules against every sampled snapshot.
+
+    Pass it to MetricsSampler(alerts=...) to evaluate on the sampling thread.
+    Callbacks receive each AlertEvent on that thread; the GUI reads
+    active_alerts() instead, which is safe from any thread.
+    """
+
+    def __init__(self, rules=(), callbacks=()):
+        self.rules = list(rules)
+        self._callbacks = list(callbacks)
+        self._lock = threading.Lock()
+        self._active = {}  # rule name -> firing AlertEvent
+
+    def add_rule(self, rule):
+        with self._lock:
+            self.rules.append(rule)
+
+    def add_callback(self, callback):
+        """Registers callback(event), called for every firing and resolved event."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def evaluate(self, snapshot):
+        """Feeds one snapshot to every rule and returns the events it produced."""
+        events = []
+        with self._lock:
+            for rule in self.rules:
+                event = rule.evaluate(snapshot)
+                if event is None:
+                    continue
+                events.append(event)
+                if event.state == "firing":
+                    self._active[rule.name] = event
+                else:
+                    self._active.pop(rule.name, None)
+            callbacks = list(self._callbacks)
+        for event in events:
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in alert callback: {e}")
+        return events
+
+    def active_alerts(self):
+        """Returns the firing events of all rules that have not resolved yet, oldest first."""
+        with self._lock:
+            return sorted(self._active.values(), key=lambda event: event.timestamp)
+
+
+def default_rules():
+    """Saturation rules used by the monitor and the exporter."""
+    return [
+        AlertRule.parse("cpu > 90 for 30s", name="CPU saturated", clear_threshold=80),
+        AlertRule.parse("memory > 90 for 30s", name="Memory nearly full", clear_threshold=85),
+        AlertRule.parse("disk > 95", name="Disk nearly full", clear_threshold=93, cooldown=600),
+    ]
+
+
+def log_file_sink(path, level=logging.WARNING):
+    """
+    Returns an AlertEngine callback that appends every event to a log file.
+
+    Args:
+        path (str): Log file, created if missing.
+        level (int): Level used for firing events; resolved events are logged as INFO.
+    """
+    logger = logging.getLogger(f"metrics_alerts.{path}")
+    if not logger.handlers:
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    def sink(event):
+        logger.log(level if event.state == "firing" else logging.INFO, event.message)
+
+    return sink
@@ -0,0 +1,185 @@
+"""
+Headless system metrics collector with a Prometheus/OpenMetrics endpoint.
+
+Samples the system_metrics functions on a background thread (MetricsSampler)
+and serves the latest values at http://HOST:PORT/metrics. A scrape only formats
+the cached snapshot, so it never waits on psutil.
+
+Usage:
+    python metrics_exporter.py [--host 127.0.0.1] [--port 9105] [--interval 1.0] [--disk-path /]
+                               [--alert-log alerts.log]
+"""
+import argparse
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics_alerts import AlertEngine, default_rules, log_file_sink
+from metrics_sampler import MetricsSampler
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+GB = 1024 ** 3
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+class _MetricWriter:
+    """Collects metric families and renders them in OpenMetrics text format."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, metric_type, help_text, samples, unit=None):
+        """
+        Adds one metric family.
+
+        Args:
+            samples (list): (labels dict, value) pairs. Counter samples get the _total suffix.
+        """
+        self.lines.append(f"# TYPE {name} {metric_type}")
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {help_text}")
+        suffix = "_total" if metric_type == "counter" else ""
+        for labels, value in samples:
+            self.lines.append(f"{name}{suffix}{_format_labels(labels)} {float(value)!r}")
+
+    def render(self):
+        return "\n".join(self.lines + ["# EOF"]) + "\n"
+
+
+def format_openmetrics(snapshot, disk_path='/'):
+    """Renders a MetricsSampler snapshot as OpenMetrics text."""
+    writer = _MetricWriter()
+    memory = snapshot["memory"]
+    disk = snapshot["disk"]
+    network = snapshot["network"]
+    writer.family("system_cpu_usage_percent", "gauge", "CPU usage over the last sampling interval.",
+                  [({}, snapshot["cpu"])])
+    writer.family("system_memory_usage_percent", "gauge", "Memory in use.", [({}, memory["percent"])])
+    writer.family("system_memory_used_bytes", "gauge", "Memory in use.", [({}, memory["used_gb"] * GB)], "bytes")
+    writer.family("system_memory_total_bytes", "gauge", "Total memory.", [({}, memory["total_gb"] * GB)], "bytes")
+    disk_labels = {"path": disk_path}
+    writer.family("system_disk_usage_percent", "gauge", "Disk space in use.", [(disk_labels, disk["percent"])])
+    writer.family("system_disk_used_bytes", "gauge", "Disk space in use.",
+                  [(disk_labels, disk["used_gb"] * GB)], "bytes")
+    writer.family("system_disk_total_bytes", "gauge", "Total disk space.",
+                  [(disk_labels, disk["total_gb"] * GB)], "bytes")
+    writer.family("system_network_sent_bytes", "counter", "Bytes sent since boot.",
+                  [({}, network["bytes_sent_gb"] * GB)], "bytes")
+    writer.family("system_network_received_bytes", "counter", "Bytes received since boot.",
+                  [({}, network["bytes_recv_gb"] * GB)], "bytes")
+    cores = snapshot.get("cpu_per_core", [])
+    writer.family("system_cpu_core_usage_percent", "gauge", "Usage of each logical CPU.",
+                  [({"core": index}, value) for index, value in enumerate(cores)])
+    partitions = snapshot.get("partitions", [])
+    for key, name, help_text, unit, scale in (
+            ("percent", "system_filesystem_usage_percent", "Space in use per mount point.", None, 1),
+            ("used_gb", "system_filesystem_used_bytes", "Space in use per mount point.", "bytes", GB),
+            ("total_gb", "system_filesystem_total_bytes", "Size of each mount point.", "bytes", GB)):
+        writer.family(name, "gauge", help_text,
+                      [({"mountpoint": part["mountpoint"], "device": part["device"], "fstype": part["fstype"]},
+                        part[key] * scale) for part in partitions], unit)
+    disks = sorted(snapshot.get("disk_io", {}).get("disks", {}).items())
+    for key, name, help_text in (
+            ("read_bytes_per_s", "system_disk_read_bytes_per_second", "Bytes read per second."),
+            ("write_bytes_per_s", "system_disk_written_bytes_per_second", "Bytes written per second."),
+            ("read_count_per_s", "system_disk_reads_per_second", "Read operations per second (IOPS)."),
+            ("write_count_per_s", "system_disk_writes_per_second", "Write operations per second (IOPS).")):
+        writer.family(name, "gauge", help_text, [({"disk": disk}, rates[key]) for disk, rates in disks])
+    interfaces = sorted(network.get("interfaces", {}).items())
+    for key, name, help_text in (
+            ("bytes_sent_per_s", "system_network_transmit_bytes_per_second", "Bytes sent per second."),
+            ("bytes_recv_per_s", "system_network_receive_bytes_per_second", "Bytes received per second."),
+            ("packets_sent_per_s", "system_network_transmit_packets_per_second", "Packets sent per second."),
+            ("packets_recv_per_s", "system_network_receive_packets_per_second", "Packets received per second.")):
+        writer.family(name, "gauge", help_text, [({"interface": nic}, rates[key]) for nic, rates in interfaces])
+    writer.family("system_metrics_sample_timestamp_seconds", "gauge", "When the served sample was taken.",
+                  [({}, snapshot["timestamp"])], "seconds")
+    return writer.render()
+
+
+class MetricsExporter:
+    """Serves the latest snapshot of a MetricsSampler over HTTP."""
+
+    def __init__(self, sampler, host="127.0.0.1", port=9105):
+        self.sampler = sampler
+        self._cache_lock = threading.Lock()
+        self._cached_timestamp = None
+        self._cached_body = b""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404, "Only /metrics is served")
+                    return
+                body = exporter.render()
+                if body is None:
+                    self.send_error(503, "No sample taken yet")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep the console quiet on frequent scrapes
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+
+    def render(self):
+        """Returns the /metrics body for the latest snapshot, formatting it at most once per sample."""
+        snapshot = self.sampler.snapshot()
+        if not snapshot:
+            return None
+        with self._cache_lock:
+            if snapshot["timestamp"] != self._cached_timestamp:
+                self._cached_body = format_openmetrics(snapshot, self.sampler.disk_path).encode("utf-8")
+                self._cached_timestamp = snapshot["timestamp"]
+            return self._cached_body
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=9105)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples")
+    parser.add_argument("--disk-path", default='C:\\' if os.name == 'nt' else '/', help="Partition to report")
+    parser.add_argument("--alert-log", help="Evaluate the default alert rules and log firing/resolved events here")
+    args = parser.parse_args()
+
+    alerts = None
+    if args.alert_log:
+        alerts = AlertEngine(default_rules(), callbacks=[log_file_sink(args.alert_log)])
+    sampler = MetricsSampler(interval=args.interval, disk_path=args.disk_path, alerts=alerts)
+    sampler.start()
+    exporter = MetricsExporter(sampler, args.host, args.port)
+    print(f"Serving metrics on http://{args.host}:{args.port}/metrics (Ctrl+C to stop)")
+    try:
+        exporter.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.shutdown()
+        sampler.stop()
+
+
+if __name__ == "__main__":
+    main()
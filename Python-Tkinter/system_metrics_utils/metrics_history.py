@@ -0,0 +1,153 @@
+import math
+import threading
+from array import array
+
+# Metrics recorded from each sampler snapshot, and how to read them from it.
+SNAPSHOT_FIELDS = {
+    "cpu": lambda s: s["cpu"],
+    "memory": lambda s: s["memory"]["percent"],
+    "disk": lambda s: s["disk"]["percent"],
+    "net_sent": lambda s: s["network"]["bytes_sent_per_s"],
+    "net_recv": lambda s: s["network"]["bytes_recv_per_s"],
+}
+
+RAW_CAPACITY = 3600        # one hour at one sample per second
+ROLLUP_SECONDS = 60        # rollup bucket width
+ROLLUP_CAPACITY = 1440     # one day of one-minute buckets
+
+
+class RingBuffer:
+    """Fixed-capacity circular buffer of floats backed by a preallocated array."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, value):
+        """Adds a value, overwriting the oldest one when full. O(1)."""
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, age):
+        """Returns the value appended age samples ago (0 is the newest)."""
+        if not 0 <= age < self._count:
+            raise IndexError("ring buffer index out of range")
+        return self._data[(self._next - 1 - age) % self.capacity]
+
+    def newest(self, count):
+        """Returns up to count of the most recent values, oldest first."""
+        count = min(count, self._count)
+        return [self[age] for age in range(count - 1, -1, -1)]
+
+
+class MetricsHistory:
+    """
+    Constant-memory history of sampled metrics.
+
+    Keeps every sample for the last hour (RAW_CAPACITY at 1 s resolution) and
+    min/avg/max rollups of ROLLUP_SECONDS buckets for the last day. Appending is
+    O(1); window queries only touch the samples inside the window. Thread-safe,
+    so the sampler thread can append while the GUI queries.
+    """
+
+    def __init__(self, metrics=tuple(SNAPSHOT_FIELDS), raw_capacity=RAW_CAPACITY,
+                 rollup_seconds=ROLLUP_SECONDS, rollup_capacity=ROLLUP_CAPACITY):
+        self.metrics = tuple(metrics)
+        self.rollup_seconds = rollup_seconds
+        self._lock = threading.Lock()
+        self._timestamps = RingBuffer(raw_capacity)
+        self._raw = {name: RingBuffer(raw_capacity) for name in self.metrics}
+        self._rollup_timestamps = RingBuffer(rollup_capacity)
+        self._rollups = {name: {kind: RingBuffer(rollup_capacity) for kind in ("min", "avg", "max")}
+                         for name in self.metrics}
+        # Running accumulators for the bucket currently being filled
+        self._bucket_start = None
+        self._bucket = {}
+
+    def append(self, timestamp, values):
+        """
+        Records one sample.
+
+        Args:
+            timestamp (float): Seconds since the epoch; must not go backwards.
+            values (dict): metric name -> float, for every name in self.metrics.
+        """
+        with self._lock:
+            bucket_start = timestamp - timestamp % self.rollup_seconds
+            if self._bucket_start is not None and bucket_start != self._bucket_start:
+                self._flush_bucket()
+            if not self._bucket:
+                self._bucket_start = bucket_start
+                self._bucket = {name: [math.inf, -math.inf, 0.0, 0] for name in self.metrics}
+            self._timestamps.append(timestamp)
+            for name in self.metrics:
+                value = float(values[name])
+                self._raw[name].append(value)
+                acc = self._bucket[name]
+                acc[0] = min(acc[0], value)
+                acc[1] = max(acc[1], value)
+                acc[2] += value
+                acc[3] += 1
+
+    def append_snapshot(self, snapshot):
+        """Records a MetricsSampler snapshot."""
+        self.append(snapshot["timestamp"], {name: SNAPSHOT_FIELDS[name](snapshot) for name in self.metrics})
+
+    def window(self, metric, seconds, now=None):
+        """Returns the raw values of metric from the last seconds, oldest first."""
+        with self._lock:
+            if not len(self._timestamps):
+                return []
+            cutoff = (self._timestamps[0] if now is None else now) - seconds
+            count = 0
+            while count < len(self._timestamps) and self._timestamps[count] > cutoff:
+                count += 1
+            return self._raw[metric].newest(count)
+
+    def percentile(self, metric, percent, seconds, now=None):
+        """Returns the given percentile (0-100) of metric over the last seconds, or None if empty."""
+        values = sorted(self.window(metric, seconds, now))
+        if not values:
+            return None
+        rank = (len(values) - 1) * percent / 100.0
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+    def summary(self, metric, seconds, now=None):
+        """Returns {"min", "avg", "max"} of metric over the last seconds, or None if empty."""
+        values = self.window(metric, seconds, now)
+        if not values:
+            return None
+        return {"min": min(values), "avg": sum(values) / len(values), "max": max(values)}
+
+    def rollups(self, metric, seconds=None):
+        """
+        Returns completed rollup buckets as (bucket_start, min, avg, max), oldest first.
+
+        Args:
+            seconds (float or None): Only buckets from the last seconds; all if None.
+        """
+        with self._lock:
+            count = len(self._rollup_timestamps)
+            if seconds is not None:
+                count = min(count, int(math.ceil(seconds / self.rollup_seconds)))
+            rings = self._rollups[metric]
+            return list(zip(self._rollup_timestamps.newest(count), rings["min"].newest(count),
+                            rings["avg"].newest(count), rings["max"].newest(count)))
+
+    def _flush_bucket(self):
+        self._rollup_timestamps.append(self._bucket_start)
+        for name, (low, high, total, count) in self._bucket.items():
+            rings = self._rollups[name]
+            rings["min"].append(low)
+            rings["avg"].append(total / count)
+            rings["max"].append(high)
+        self._bucket = {}
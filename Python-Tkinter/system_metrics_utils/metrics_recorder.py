@@ -0,0 +1,384 @@
+"""
+Compact binary recording and replay of system metrics.
+
+A recording is a 256-byte header followed by fixed-width little-endian records:
+a float64 timestamp and one float32 per entry of RECORD_FIELDS. At one sample
+per second that is about 5.9 MB per day. Because every record has the same size,
+a recording can be memory-mapped and searched by timestamp with a binary search.
+
+Usage:
+    python metrics_recorder.py info metrics.rec
+    python metrics_recorder.py dump metrics.rec [--start TS] [--end TS]
+"""
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"SMRC"
+VERSION = 1
+HEADER_SIZE = 256
+_HEADER = struct.Struct("<4sHHH")  # magic, version, record size, field count; then comma-separated names
+
+# Fixed-width fields taken from each MetricsSampler snapshot. Per-core, per-disk
+# and per-interface values vary in number, so only their totals are recorded.
+RECORD_FIELDS = {
+    "cpu": lambda s: s["cpu"],
+    "memory_percent": lambda s: s["memory"]["percent"],
+    "memory_used_gb": lambda s: s["memory"]["used_gb"],
+    "memory_total_gb": lambda s: s["memory"]["total_gb"],
+    "disk_percent": lambda s: s["disk"]["percent"],
+    "disk_used_gb": lambda s: s["disk"]["used_gb"],
+    "disk_total_gb": lambda s: s["disk"]["total_gb"],
+    "bytes_sent_per_s": lambda s: s["network"]["bytes_sent_per_s"],
+    "bytes_recv_per_s": lambda s: s["network"]["bytes_recv_per_s"],
+    "bytes_sent_gb": lambda s: s["network"]["bytes_sent_gb"],
+    "bytes_recv_gb": lambda s: s["network"]["bytes_recv_gb"],
+    "read_bytes_per_s": lambda s: s.get("disk_io", {}).get("read_bytes_per_s", 0.0),
+    "write_bytes_per_s": lambda s: s.get("disk_io", {}).get("write_bytes_per_s", 0.0),
+    "read_count_per_s": lambda s: s.get("disk_io", {}).get("read_count_per_s", 0.0),
+    "write_count_per_s": lambda s: s.get("disk_io", {}).get("write_count_per_s", 0.0),
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2   # about 11 days at 1 Hz before rolling over
+DEFAULT_BACKUPS = 3
+FSYNC_EVERY = 60                      # records
+FSYNC_INTERVAL = 30.0                 # seconds
+
+
+def _record_struct(field_count):
+    return struct.Struct("<d" + "f" * field_count)
+
+
+def _pack_header(fields):
+    names = ",".join(fields).encode("ascii")
+    header = _HEADER.pack(MAGIC, VERSION, _record_struct(len(fields)).size, len(fields)) + names
+    if len(header) > HEADER_SIZE:
+        raise ValueError("Too many fields for the recording header")
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+class MetricsRecorder:
+    """
+    Appends MetricsSampler snapshots to a rolling binary file.
+
+    Records are written through a buffered file and only flushed and fsynced
+    every fsync_every records or fsync_interval seconds, whichever comes first,
+    so a crash loses at most that much. When the file would grow past max_bytes
+    it is renamed to path.1 (older files shift to path.2, ...) and a new file
+    is started, like logging.handlers.RotatingFileHandler.
+
+    Pass it to MetricsSampler(recorder=...) to record every sample.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS,
+                 fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.fields = tuple(RECORD_FIELDS)
+        self._readers = tuple(RECORD_FIELDS.values())
+        self._record = _record_struct(len(self.fields))
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._open()
+
+    def _open(self):
+        header = _pack_header(self.fields)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER_SIZE:
+            with open(self.path, "rb") as f:
+                existing = f.read(HEADER_SIZE)
+            if existing == header:
+                # Append, dropping a partial record left by a crash
+                self._file = open(self.path, "r+b")
+                size = os.path.getsize(self.path)
+                self._size = size - (size - HEADER_SIZE) % self._record.size
+                self._file.truncate(self._size)
+                self._file.seek(self._size)
+                return
+            self._rotate_files()  # different layout: keep it as a backup
+        self._file = open(self.path, "wb")
+        self._file.write(header)
+        self._size = HEADER_SIZE
+
+    def _rotate_files(self):
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def append_snapshot(self, snapshot):
+        """Writes one snapshot as a fixed-width record."""
+        record = self._record.pack(snapshot["timestamp"], *(read(snapshot) for read in self._readers))
+        with self._lock:
+            if self._file is None:
+                raise ValueError("Recorder is closed")
+            if self._size + len(record) > self.max_bytes:
+                self._sync()
+                self._file.close()
+                self._rotate_files()
+                self._open()
+            self._file.write(record)
+            self._size += len(record)
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def flush(self):
+        """Flushes and fsyncs everything written so far."""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+
+class _Timestamps:
+    """Sequence view of the record timestamps, so bisect can search the mapping directly."""
+
+    def __init__(self, recording):
+        self._recording = recording
+
+    def __len__(self):
+        return len(self._recording)
+
+    def __getitem__(self, index):
+        return self._recording.timestamp(index)
+
+
+class MetricsRecording:
+    """
+    Read-only, memory-mapped view of a recording.
+
+    Records are decoded on demand, so opening a large recording and jumping to
+    a time range only touches the pages that are read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+                raise ValueError(f"{path} is not a metrics recording")
+            _, version, record_size, field_count = _HEADER.unpack_from(header)
+            if version != VERSION:
+                raise ValueError(f"Unsupported recording version: {version}")
+            names = header[_HEADER.size:].rstrip(b"\0").decode("ascii")
+            self.fields = tuple(names.split(",")) if names else ()
+            self._record = _record_struct(field_count)
+            if self._record.size != record_size or len(self.fields) != field_count:
+                raise ValueError(f"Corrupt recording header in {path}")
+            size = os.fstat(self._file.fileno()).st_size
+            self._count = (size - HEADER_SIZE) // record_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._count else None
+        except Exception:
+            self._file.close()
+            raise
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _offset(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+        return HEADER_SIZE + index * self._record.size
+
+    def timestamp(self, index):
+        return struct.unpack_from("<d", self._map, self._offset(index))[0]
+
+    def values(self, index):
+        """Returns (timestamp, {field: value}) of one record."""
+        timestamp, *values = self._record.unpack_from(self._map, self._offset(index))
+        return timestamp, dict(zip(self.fields, values))
+
+    def snapshot(self, index):
+        """Returns a record shaped like a MetricsSampler snapshot."""
+        timestamp, values = self.values(index)
+        return snapshot_from_values(timestamp, values)
+
+    def find(self, timestamp):
+        """Returns the index of the first record at or after timestamp (binary search)."""
+        return bisect.bisect_left(_Timestamps(self), timestamp)
+
+    def range(self, start=None, end=None):
+        """Yields (timestamp, values) for records with start <= timestamp < end."""
+        index = 0 if start is None else self.find(start)
+        stop = self._count if end is None else self.find(end)
+        for i in range(index, stop):
+            yield self.values(i)
+
+
+def snapshot_from_values(timestamp, values):
+    """Rebuilds the snapshot layout used by the GUI from recorded fields (missing ones read as 0)."""
+    get = lambda name: values.get(name, 0.0)
+    return {
+        "timestamp": timestamp,
+        "cpu": round(get("cpu"), 1),
+        "cpu_per_core": [],
+        "memory": {"percent": round(get("memory_percent"), 1), "used_gb": get("memory_used_gb"),
+                   "total_gb": get("memory_total_gb")},
+        "disk": {"percent": round(get("disk_percent"), 1), "used_gb": get("disk_used_gb"),
+                 "total_gb": get("disk_total_gb")},
+        "partitions": [],
+        "disk_io": {"read_bytes_per_s": get("read_bytes_per_s"), "write_bytes_per_s": get("write_bytes_per_s"),
+                    "read_count_per_s": get("read_count_per_s"), "write_count_per_s": get("write_count_per_s"),
+                    "disks": {}},
+        "network": {"bytes_sent_per_s": get("bytes_sent_per_s"), "bytes_recv_per_s": get("bytes_recv_per_s"),
+                    "bytes_sent_gb": get("bytes_sent_gb"), "bytes_recv_gb": get("bytes_recv_gb"),
+                    "packets_sent_per_s": 0.0, "packets_recv_per_s": 0.0, "interfaces": {}},
+    }
+
+
+class ReplayPlayer:
+    """
+    Plays a recording back with the same interface as MetricsSampler.
+
+    snapshot() returns the latest record whose (scaled) time has come, so the
+    GUI can show a recorded incident unchanged. speed=10 plays ten times faster
+    than real time. The snapshot keeps the original timestamp.
+    """
+
+    def __init__(self, path, speed=1.0, start=None, history=None, alerts=None, disk_path='/'):
+        """
+        Args:
+            path (str): Recording written by MetricsRecorder.
+            speed (float): Playback speed factor.
+            start (float or None): Timestamp to start from; the beginning if None.
+            history (MetricsHistory or None): Every replayed record is also appended here.
+            alerts (AlertEngine or None): Every replayed record is also evaluated here.
+                Use an engine without the live log sink, or replayed alerts are
+                logged as if they had just fired.
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.recording = MetricsRecording(path)
+        self.speed = speed
+        self.start_at = start
+        self.history = history
+        self.alerts = alerts
+        self.disk_path = disk_path
+        self._lock = threading.Lock()
+        self._snapshot = {}
+        self._error = None
+        self._finished = False
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ReplayPlayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.recording.close()
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    def last_error(self):
+        with self._lock:
+            return self._error
+
+    def finished(self):
+        """True once the last record has been played."""
+        with self._lock:
+            return self._finished
+
+    def _run(self):
+        recording = self.recording
+        index = 0 if self.start_at is None else recording.find(self.start_at)
+        if index >= len(recording):
+            with self._lock:
+                self._finished = True
+            return
+        first = recording.timestamp(index)
+        began = time.monotonic()
+        while index < len(recording):
+            delay = (recording.timestamp(index) - first) / self.speed - (time.monotonic() - began)
+            if delay > 0 and self._stop_event.wait(delay):
+                return
+            if self._stop_event.is_set():
+                return
+            try:
+                sample = recording.snapshot(index)
+                with self._lock:
+                    self._snapshot = sample
+                    self._error = None
+                if self.history is not None:
+                    self.history.append_snapshot(sample)
+                if self.alerts is not None:
+                    self.alerts.evaluate(sample)
+            except Exception as e:
+                with self._lock:
+                    self._error = e
+            index += 1
+        with self._lock:
+            self._finished = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("info", "dump"))
+    parser.add_argument("path")
+    parser.add_argument("--start", type=float, help="First timestamp (seconds since the epoch)")
+    parser.add_argument("--end", type=float, help="Timestamp to stop before")
+    args = parser.parse_args()
+
+    with MetricsRecording(args.path) as recording:
+        if args.command == "info":
+            print(f"{len(recording)} records, fields: {', '.join(recording.fields)}")
+            if len(recording):
+                first, last = recording.timestamp(0), recording.timestamp(len(recording) - 1)
+                print(f"from {time.ctime(first)} to {time.ctime(last)} ({last - first:.0f} s)")
+            return
+        print(",".join(("timestamp",) + recording.fields))
+        for timestamp, values in recording.range(args.start, args.end):
+            print(",".join([f"{timestamp:.3f}"] + [f"{values[name]:g}" for name in recording.fields]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import system_metrics
+
+
+class MetricsSampler:
+    """
+    Samples system metrics on a background thread and keeps the latest values.
+
+    The Tk thread only calls snapshot(), which returns immediately, so the GUI
+    never blocks on psutil. Each snapshot is a new dict that is never modified
+    after it has been published, so readers can use it without copying.
+    """
+
+    def __init__(self, interval=1.0, disk_path='/', collect=system_metrics.collect_metrics, history=None,
+                 alerts=None, recorder=None):
+        """
+        Args:
+            interval (float): Seconds between samples (also the CPU measurement window).
+            disk_path (str): Partition reported under "disk".
+            collect (callable): disk_path -> dict of metrics.
+            history (MetricsHistory or None): Every sample is also appended here.
+            alerts (AlertEngine or None): Every sample is also evaluated against these rules.
+            recorder (MetricsRecorder or None): Every sample is also written to this recording.
+        """
+        self.interval = interval
+        self.disk_path = disk_path
+        self.history = history
+        self.alerts = alerts
+        self.recorder = recorder
+        self._collect = collect
+        self._lock = threading.Lock()
+        self._snapshot = {}
+        self._error = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the sampling thread (does nothing if it is already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MetricsSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Asks the sampling thread to finish and waits for it."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def snapshot(self):
+        """
+        Returns the latest sample: {"timestamp", "cpu", "cpu_per_core", "memory", "disk",
+        "partitions", "disk_io", "network"}, or an empty dict before the first sample
+        has been taken.
+        """
+        with self._lock:
+            return self._snapshot
+
+    def last_error(self):
+        """Returns the exception raised by the most recent sampling attempt, or None."""
+        with self._lock:
+            return self._error
+
+    def _run(self):
+        # The first pass only sets the CPU and I/O counter baselines
+        try:
+            self._collect(self.disk_path)
+        except Exception as e:
+            with self._lock:
+                self._error = e
+        while not self._stop_event.wait(self.interval):
+            try:
+                sample = self._collect(self.disk_path)
+                sample["timestamp"] = time.time()
+                with self._lock:
+                    self._snapshot = sample
+                    self._error = None
+                if self.history is not None:
+                    self.history.append_snapshot(sample)
+                if self.alerts is not None:
+                    self.alerts.evaluate(sample)
+                if self.recorder is not None:
+                    self.recorder.append_snapshot(sample)
+            except Exception as e:
+                with self._lock:
+                    self._error = e
@@ -0,0 +1,108 @@
+import heapq
+import threading
+import time
+
+import psutil
+
+# Only these attributes are read per process; everything else is skipped.
+PROCESS_ATTRS = ["pid", "name", "cpu_percent", "memory_info"]
+
+SORT_KEYS = {
+    "cpu": lambda row: row["cpu_percent"],
+    "memory": lambda row: row["rss_mb"],
+}
+
+
+class ProcessSampler:
+    """
+    Samples the top-N processes by CPU or memory on a background thread.
+
+    Uses psutil.process_iter with a restricted attrs list. process_iter hands
+    back the same cached Process objects on every tick, so cpu_percent is the
+    correct delta since the previous tick instead of a fresh 0.0 each time.
+
+    The cost of each pass is measured and reported. If a pass takes longer than
+    max_duty_cycle of the interval (hosts with thousands of PIDs), the interval
+    is stretched so sampling never uses more than that share of one core.
+    """
+
+    def __init__(self, top_n=10, interval=2.0, sort_by="cpu", max_duty_cycle=0.05):
+        """
+        Args:
+            top_n (int): Number of processes kept in each snapshot.
+            interval (float): Desired seconds between passes.
+            sort_by (str): "cpu" or "memory".
+            max_duty_cycle (float): Largest fraction of time spent sampling.
+        """
+        self.top_n = top_n
+        self.interval = interval
+        self.sort_by = sort_by
+        self.max_duty_cycle = max_duty_cycle
+        self._lock = threading.Lock()
+        self._snapshot = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the sampling thread (does nothing if it is already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ProcessSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Asks the sampling thread to finish and waits for it."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def snapshot(self):
+        """
+        Returns the latest pass, or an empty dict before the first one:
+
+            timestamp       when the pass finished
+            processes       top-N rows: {"pid", "name", "cpu_percent", "rss_mb"}
+            process_count   number of processes scanned
+            sample_ms       wall time of the pass
+            interval        seconds until the next pass (after duty-cycle stretching)
+        """
+        with self._lock:
+            return self._snapshot
+
+    def sample_once(self):
+        """Scans all processes once and returns the snapshot dict (also used by the thread)."""
+        start = time.perf_counter()
+        rows = []
+        for process in psutil.process_iter(attrs=PROCESS_ATTRS, ad_value=None):
+            info = process.info
+            memory = info["memory_info"]
+            rows.append({
+                "pid": info["pid"],
+                "name": info["name"] or "?",
+                "cpu_percent": info["cpu_percent"] or 0.0,
+                "rss_mb": memory.rss / (1024 ** 2) if memory else 0.0,
+            })
+        top = heapq.nlargest(self.top_n, rows, key=SORT_KEYS[self.sort_by])
+        sample_ms = (time.perf_counter() - start) * 1000
+        interval = max(self.interval, sample_ms / 1000 / self.max_duty_cycle)
+        return {"timestamp": time.time(), "processes": top, "process_count": len(rows),
+                "sample_ms": sample_ms, "interval": interval}
+
+    def _run(self):
+        # First pass only primes cpu_percent for every process
+        interval = self.interval
+        try:
+            self.sample_once()
+        except Exception as e:
+            print(f"Error sampling processes: {e}")
+        while not self._stop_event.wait(interval):
+            try:
+                snapshot = self.sample_once()
+            except Exception as e:
+                print(f"Error sampling processes: {e}")
+                continue
+            interval = snapshot["interval"]
+            with self._lock:
+                self._snapshot = snapshot
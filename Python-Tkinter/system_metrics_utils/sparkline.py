@@ -0,0 +1,93 @@
+import time
+import tkinter as tk
+from collections import deque
+
+
+class Sparkline(tk.Canvas):
+    """
+    Small strip chart of the most recent values of one metric.
+
+    The polyline is created once; each new value only updates its coordinates
+    with Canvas.coords, so Tk does not delete and re-create canvas items on
+    every tick.
+    """
+
+    def __init__(self, master, width=120, height=24, points=60, max_value=None,
+                 color="#007bff", bg="#ffffff", **kwargs):
+        """
+        Args:
+            points (int): Number of values shown (older values scroll out).
+            max_value (float or None): Fixed top of the scale (e.g. 100 for percentages);
+                None scales to the largest value currently shown.
+        """
+        super().__init__(master, width=width, height=height, bg=bg, highlightthickness=0, **kwargs)
+        self.chart_width = width
+        self.chart_height = height
+        self.max_value = max_value
+        self.values = deque(maxlen=points)
+        self._step = (width - 1) / max(points - 1, 1)
+        self._line = self.create_line(0, height - 1, 0, height - 1, fill=color, width=1)
+
+    def push(self, value):
+        """Appends a value and redraws the line."""
+        self.values.append(value)
+        self.redraw()
+
+    def extend(self, values):
+        """Appends several values (e.g. from MetricsHistory.window) and redraws once."""
+        self.values.extend(values)
+        self.redraw()
+
+    def redraw(self):
+        if len(self.values) < 2:
+            return
+        top = self.max_value if self.max_value is not None else max(self.values)
+        scale = (self.chart_height - 2) / top if top > 0 else 0
+        offset = self.chart_width - 1 - self._step * (len(self.values) - 1)
+        bottom = self.chart_height - 1
+        coords = []
+        for i, value in enumerate(self.values):
+            coords.append(offset + i * self._step)
+            coords.append(bottom - value * scale)
+        self.coords(self._line, *coords)
+
+
+class FrameTimer:
+    """
+    Measures how long each UI refresh takes on the Tk thread.
+
+    Usage:
+        with timer:
+            ...update labels and sparklines...
+
+    After every frame, callback (if given) is called with the frame time in
+    milliseconds; last_ms, average_ms and max_ms cover the last `window` frames.
+    """
+
+    def __init__(self, window=60, callback=None):
+        self.callback = callback
+        self.frames = deque(maxlen=window)
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        self.frames.append(elapsed_ms)
+        if self.callback is not None:
+            self.callback(elapsed_ms)
+        return False
+
+    @property
+    def last_ms(self):
+        return self.frames[-1] if self.frames else 0.0
+
+    @property
+    def average_ms(self):
+        return sum(self.frames) / len(self.frames) if self.frames else 0.0
+
+    @property
+    def max_ms(self):
+        return max(self.frames) if self.frames else 0.0
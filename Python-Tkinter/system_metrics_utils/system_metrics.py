@@ -1,9 +1,25 @@
 import psutil
 import  os
+import time
 
 
-def get_cpu_usage():
-    return  psutil.cpu_percent(interval=1)
+def get_cpu_usage(interval=1):
+    """
+    Returns CPU usage in percent.
+
+    With interval=1 this blocks for a second while it measures. Pass interval=None
+    to return immediately with the usage since the previous call (used by
+    MetricsSampler, which calls it once per sampling period).
+    """
+    return  psutil.cpu_percent(interval=interval)
+
+def get_cpu_per_core(interval=None):
+    """
+    Returns a list with the usage of every logical CPU in percent.
+
+    Like get_cpu_usage(interval=None), each call measures since the previous one.
+    """
+    return psutil.cpu_percent(interval=interval, percpu=True)
 
 def get_memory_usage():
     memory_info = psutil.virtual_memory()
@@ -28,14 +44,235 @@ def get_disk_usage(path='/'):
         "total_gb": total_gb
     }
 
-def get_network_activity():
+# Mount points change rarely, so the partition list is only re-read this often
+PARTITION_REFRESH_S = 60.0
+_partition_cache = {"checked": None, "partitions": []}
+
+
+def _list_partitions(now):
+    if _partition_cache["checked"] is None or now - _partition_cache["checked"] >= PARTITION_REFRESH_S:
+        _partition_cache["partitions"] = [part for part in psutil.disk_partitions(all=False)
+                                          if part.fstype and 'cdrom' not in part.opts]
+        _partition_cache["checked"] = now
+    return _partition_cache["partitions"]
+
+
+def get_partition_usage(now=None):
     """
-    Returns a dictionary with network activity details (bytes_sent_gb, bytes_recv_gb).
+    Returns the usage of every mounted physical partition.
+
+    Returns:
+        list: One dict per mount point with "mountpoint", "device", "fstype",
+            "percent", "used_gb" and "total_gb". Mounts that cannot be read
+            (permissions, ejected media) are left out.
     """
-    net_io = psutil.net_io_counters()
-    bytes_sent_gb = net_io.bytes_sent / (1024**3)
-    bytes_recv_gb = net_io.bytes_recv / (1024**3)
-    return {
+    partitions = []
+    for part in _list_partitions(time.monotonic() if now is None else now):
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+        except OSError:
+            continue
+        partitions.append({
+            "mountpoint": part.mountpoint,
+            "device": part.device,
+            "fstype": part.fstype,
+            "percent": usage.percent,
+            "used_gb": usage.used / (1024 ** 3),
+            "total_gb": usage.total / (1024 ** 3)
+        })
+    return partitions
+
+# psutil counters may be 32-bit on some platforms and wrap around at this value
+COUNTER_WRAP = 2 ** 32
+NET_COUNTERS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv")
+DISK_IO_COUNTERS = ("read_bytes", "write_bytes", "read_count", "write_count")
+
+
+def counter_delta(previous, current):
+    """
+    Returns how much a cumulative counter grew, allowing for wrap-around and resets.
+
+    A smaller current value is treated as a 32-bit wrap when that gives a
+    plausible delta, otherwise as a counter reset (e.g. interface re-created).
+    """
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_WRAP and current + COUNTER_WRAP - previous < COUNTER_WRAP // 2:
+        return current + COUNTER_WRAP - previous
+    return current
+
+
+class CounterRateTracker:
+    """
+    Turns cumulative per-device psutil counters into per-second rates.
+
+    Keeps the previous sample of every device (interface, disk, ...) and its
+    timestamp. The first sample of a device has no rate yet (0.0).
+    """
+
+    def __init__(self, fields):
+        """
+        Args:
+            fields (tuple): Counter attribute names read from each psutil namedtuple.
+        """
+        self.fields = tuple(fields)
+        self._previous = {}  # device -> (timestamp, counters)
+
+    def update(self, counters_by_device, now=None):
+        """
+        Records a new sample and returns {device: {"<counter>_per_s": rate, ...}}.
+
+        Args:
+            counters_by_device (dict): device name -> psutil counters namedtuple.
+            now (float or None): time.monotonic() of the sample; taken if None.
+        """
+        if now is None:
+            now = time.monotonic()
+        rates = {}
+        current = {}
+        for device, counters in counters_by_device.items():
+            values = tuple(getattr(counters, name) for name in self.fields)
+            current[device] = (now, values)
+            previous = self._previous.get(device)
+            elapsed = now - previous[0] if previous else 0
+            if elapsed <= 0:
+                rates[device] = {f"{name}_per_s": 0.0 for name in self.fields}
+                continue
+            rates[device] = {f"{name}_per_s": counter_delta(old, new) / elapsed
+                             for name, old, new in zip(self.fields, previous[1], values)}
+        self._previous = current  # devices that disappeared are forgotten
+        return rates
+
+
+class NetworkRateTracker(CounterRateTracker):
+    """Per-interface rates of net_io_counters(pernic=True)."""
+
+    def __init__(self):
+        super().__init__(NET_COUNTERS)
+
+    def update(self, counters_by_nic=None, now=None):
+        """
+        Args:
+            counters_by_nic (dict or None): psutil.net_io_counters(pernic=True); read if None.
+            now (float or None): time.monotonic() of the sample; taken if None.
+        """
+        if counters_by_nic is None:
+            counters_by_nic = psutil.net_io_counters(pernic=True)
+        return super().update(counters_by_nic, now)
+
+
+class DiskIORateTracker(CounterRateTracker):
+    """
+    Per-disk rates of disk_io_counters(perdisk=True), plus system-wide totals.
+
+    read_count_per_s and write_count_per_s are the read and write IOPS.
+    """
+
+    def __init__(self):
+        super().__init__(DISK_IO_COUNTERS)
+        self._totals = CounterRateTracker(DISK_IO_COUNTERS)
+
+    def update(self, counters_by_disk=None, now=None):
+        """
+        Args:
+            counters_by_disk (dict or None): psutil.disk_io_counters(perdisk=True); read if None.
+            now (float or None): time.monotonic() of the sample; taken if None.
+        """
+        if counters_by_disk is None:
+            counters_by_disk = psutil.disk_io_counters(perdisk=True) or {}
+        return super().update(counters_by_disk, now)
+
+    def update_totals(self, counters=None, now=None):
+        """
+        Returns the system-wide rates from disk_io_counters(perdisk=False).
+
+        The per-disk dict is not summed for these: on Linux it lists partitions
+        (sda1, nvme0n1p1) next to their disks, so the same I/O would be counted
+        several times. psutil's own total only includes whole storage devices.
+
+        Args:
+            counters (namedtuple or None): psutil.disk_io_counters(perdisk=False); read if None.
+            now (float or None): time.monotonic() of the sample; taken if None.
+        """
+        if counters is None:
+            counters = psutil.disk_io_counters(perdisk=False)
+        if counters is None:  # no disks (e.g. some containers)
+            return {f"{name}_per_s": 0.0 for name in self.fields}
+        return self._totals.update({"total": counters}, now)["total"]
+
+
+_network_tracker = NetworkRateTracker()
+_disk_io_tracker = DiskIORateTracker()
+
+
+def get_network_activity(tracker=None, now=None):
+    """
+    Returns a dictionary with network activity details.
+
+    Keys:
+        bytes_sent_gb, bytes_recv_gb: lifetime totals in GB.
+        bytes_sent_per_s, bytes_recv_per_s, packets_sent_per_s, packets_recv_per_s:
+            rates summed over all interfaces since the previous call.
+        interfaces: the same rates per interface.
+
+    Args:
+        tracker (NetworkRateTracker or None): Keeps the previous sample; a
+            module-level tracker is used if None.
+    """
+    tracker = tracker or _network_tracker
+    per_nic = psutil.net_io_counters(pernic=True)
+    interfaces = tracker.update(per_nic, now)
+    bytes_sent_gb = sum(counters.bytes_sent for counters in per_nic.values()) / (1024**3)
+    bytes_recv_gb = sum(counters.bytes_recv for counters in per_nic.values()) / (1024**3)
+    activity = {
         "bytes_sent_gb": bytes_sent_gb,
-        "bytes_recv_gb": bytes_recv_gb
-    }
\ No newline at end of file
+        "bytes_recv_gb": bytes_recv_gb,
+        "interfaces": interfaces
+    }
+    for name in NET_COUNTERS:
+        key = f"{name}_per_s"
+        activity[key] = sum(rates[key] for rates in interfaces.values())
+    return activity
+
+
+def get_disk_io_activity(tracker=None, now=None):
+    """
+    Returns per-disk I/O rates since the previous call.
+
+    Keys:
+        read_bytes_per_s, write_bytes_per_s, read_count_per_s, write_count_per_s:
+            system-wide rates (the *_count_per_s values are IOPS).
+        disks: the same rates per disk. On Linux this includes partitions as
+            well as whole disks, so the entries do not add up to the totals.
+
+    Args:
+        tracker (DiskIORateTracker or None): Keeps the previous sample; a
+            module-level tracker is used if None.
+    """
+    tracker = tracker or _disk_io_tracker
+    activity = tracker.update_totals(now=now)
+    activity["disks"] = tracker.update(now=now)
+    return activity
+
+
+def collect_metrics(disk_path='/'):
+    """
+    Gathers every metric shown by the monitor in one pass without blocking.
+
+    CPU and I/O rates are measured since the previous call, so this is meant
+    to be called periodically (see metrics_sampler.MetricsSampler). The
+    aggregate CPU figure is the mean of the per-core values, so /proc/stat (or
+    its equivalent) is read once per pass; the partition list is cached for
+    PARTITION_REFRESH_S and only disk_usage is queried per mount.
+    """
+    now = time.monotonic()
+    per_core = get_cpu_per_core()
+    return {
+        "cpu": round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+        "cpu_per_core": per_core,
+        "memory": get_memory_usage(),
+        "disk": get_disk_usage(disk_path),
+        "partitions": get_partition_usage(now),
+        "disk_io": get_disk_io_activity(now=now),
+        "network": get_network_activity(now=now)
+    }
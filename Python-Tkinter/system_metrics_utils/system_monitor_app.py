@@ -2,15 +2,54 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image, ImageTk # For image handling
 import os # For path manipulation
+import datetime
+import argparse
+import sys
 
 # Import the separated system metrics logic
-import system_metrics
+from metrics_sampler import MetricsSampler
+from metrics_history import MetricsHistory, SNAPSHOT_FIELDS
+from sparkline import Sparkline, FrameTimer
+from process_monitor import ProcessSampler
+from metrics_alerts import AlertEngine, default_rules, log_file_sink
+from metrics_recorder import MetricsRecorder, ReplayPlayer
+
+# Optional event-loop profiler shared by the Tkinter apps (run with TK_PROFILE=1 to enable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tk_event_loop_profiler"))
+try:
+    import event_loop_profiler
+except ImportError:
+    event_loop_profiler = None
+
+# How often the labels are refreshed from the sampler's latest snapshot.
+# Reading a snapshot never blocks, so this can be much shorter than the sampling interval.
+UI_REFRESH_MS = 250
+SAMPLE_INTERVAL_S = 1.0
+# Kept out of the source tree, like the compression tool's cache
+ALERT_LOG = os.path.join(os.path.expanduser("~"), ".system_monitor", "alerts.log")
+
+def format_rate(bytes_per_s):
+    """Formats a byte rate as B/s, KB/s or MB/s."""
+    if bytes_per_s >= 1024 ** 2:
+        return f"{bytes_per_s / 1024 ** 2:.2f} MB/s"
+    if bytes_per_s >= 1024:
+        return f"{bytes_per_s / 1024:.1f} KB/s"
+    return f"{bytes_per_s:.0f} B/s"
+
 
 class SystemMonitorApp:
-    def __init__(self, master):
+    def __init__(self, master, record_path=None, replay_path=None, replay_speed=1.0, alert_log=ALERT_LOG):
+        """
+        Args:
+            record_path (str or None): Also write every sample to this binary recording.
+            replay_path (str or None): Show this recording instead of live metrics.
+            replay_speed (float): Playback speed factor for replay_path.
+            alert_log (str): File that firing/resolved alert events are appended to.
+        """
         self.master = master
-        master.title("System Monitor")
-        master.geometry("450x480") # Increased height for the image
+        self.replay_speed = replay_speed if replay_path else None
+        master.title("System Monitor" if replay_path is None else f"System Monitor - replay of {os.path.basename(replay_path)}")
+        master.geometry("640x820") # Increased height for the image
         master.resizable(False, False)
         master.configure(bg="#f0f0f0") # Light grey background
 
@@ -56,9 +95,15 @@ class SystemMonitorApp:
                  font=("Arial", 16, "bold"), bg="#f0f0f0", fg="#333333") \
             .pack(pady=5) # Reduced pady as icon is already there
 
+        # Alert banner, only shown while a rule is firing
+        self.alert_banner = tk.Label(master, text="", font=("Arial", 11, "bold"), bg="#dc3545", fg="#ffffff",
+                                     padx=10, pady=4)
+        self.alert_text = ""
+
         # Frame for displaying metrics
         metrics_frame = tk.LabelFrame(master, text="System Metrics", padx=20, pady=15, bg="#ffffff", bd=2, relief=tk.GROOVE)
         metrics_frame.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        self.metrics_frame = metrics_frame
 
         # CPU Usage
         tk.Label(metrics_frame, text="CPU Usage:", font=("Arial", 12, "bold"), bg="#ffffff").grid(row=0, column=0, sticky="w", pady=5)
@@ -87,48 +132,195 @@ class SystemMonitorApp:
         self.net_recv_label = tk.Label(metrics_frame, text="N/A", font=("Arial", 12), bg="#ffffff", fg="#007bff")
         self.net_recv_label.grid(row=4, column=1, sticky="w", pady=5)
 
+        # Sparklines of the last two minutes next to each metric
+        self.sparklines = {}
+        for row, (metric, max_value) in enumerate((("cpu", 100), ("memory", 100), ("disk", 100),
+                                                   ("net_sent", None), ("net_recv", None))):
+            self.sparklines[metric] = Sparkline(metrics_frame, points=120, max_value=max_value)
+            self.sparklines[metric].grid(row=row, column=2, sticky="e", padx=(10, 0), pady=5)
+        metrics_frame.grid_columnconfigure(1, weight=1)
+
+        # Measures the Tk-thread time of each refresh; the result is shown in the status bar
+        self.frame_timer = FrameTimer()
+
+        # Windowed statistics from the sample history
+        tk.Label(metrics_frame, text="CPU p95 (5 min):", font=("Arial", 12, "bold"), bg="#ffffff").grid(row=5, column=0, sticky="w", pady=5)
+        self.cpu_p95_label = tk.Label(metrics_frame, text="N/A", font=("Arial", 12), bg="#ffffff", fg="#007bff")
+        self.cpu_p95_label.grid(row=5, column=1, sticky="w", pady=5)
+
+        # Per-core CPU and summed disk I/O, from the same sampling pass
+        tk.Label(metrics_frame, text="Per-core CPU:", font=("Arial", 12, "bold"), bg="#ffffff").grid(row=6, column=0, sticky="nw", pady=5)
+        self.cores_label = tk.Label(metrics_frame, text="N/A", font=("Arial", 10), bg="#ffffff", fg="#007bff",
+                                    justify=tk.LEFT, wraplength=300)
+        self.cores_label.grid(row=6, column=1, columnspan=2, sticky="w", pady=5)
+
+        tk.Label(metrics_frame, text="Disk I/O:", font=("Arial", 12, "bold"), bg="#ffffff").grid(row=7, column=0, sticky="w", pady=5)
+        self.disk_io_label = tk.Label(metrics_frame, text="N/A", font=("Arial", 12), bg="#ffffff", fg="#007bff")
+        self.disk_io_label.grid(row=7, column=1, columnspan=2, sticky="w", pady=5)
+
+        # Top processes by CPU (sampled on its own background thread)
+        process_frame = tk.LabelFrame(master, text="Top Processes (CPU)", padx=10, pady=5, bg="#ffffff", bd=2, relief=tk.GROOVE)
+        process_frame.pack(padx=20, pady=(0, 10), fill=tk.BOTH)
+        self.process_tree = ttk.Treeview(process_frame, columns=("PID", "Name", "CPU", "RSS"), show="headings", height=6)
+        for column, heading, width in (("PID", "PID", 70), ("Name", "Name", 250), ("CPU", "CPU %", 80), ("RSS", "RSS (MB)", 100)):
+            self.process_tree.heading(column, text=heading)
+            self.process_tree.column(column, width=width, anchor="w" if column == "Name" else "e")
+        self.process_tree.pack(fill=tk.BOTH, expand=True)
+        self.process_cost_label = tk.Label(process_frame, text="Sampling processes...", font=("Arial", 9), bg="#ffffff", fg="#666666")
+        self.process_cost_label.pack(anchor="w")
+
         # Status Label
-        self.status_label = tk.Label(master, text="Updating...", bd=1, relief=tk.SUNKEN, anchor=tk.W, bg="#e0e0e0")
+        self.status_label = tk.Label(master, text="Sampling...", bd=1, relief=tk.SUNKEN, anchor=tk.W, bg="#e0e0e0")
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
 
+        # Metrics are sampled on a background thread; the Tk thread only reads snapshots
+        self.history = MetricsHistory()
+        if replay_path:
+            # Replayed alerts only drive the banner; they are history, not events for the live alerts.log
+            self.alerts = AlertEngine(default_rules())
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(alert_log)), exist_ok=True)
+            self.alerts = AlertEngine(default_rules(), callbacks=[log_file_sink(alert_log)])
+        self.recorder = MetricsRecorder(record_path) if record_path else None
+        if replay_path:
+            self.sampler = ReplayPlayer(replay_path, speed=replay_speed, history=self.history, alerts=self.alerts,
+                                        disk_path=self.disk_path)
+        else:
+            self.sampler = MetricsSampler(interval=SAMPLE_INTERVAL_S, disk_path=self.disk_path, history=self.history,
+                                          alerts=self.alerts, recorder=self.recorder)
+        self.sampler.start()
+        self.last_timestamp = None
+        self.process_sampler = ProcessSampler(top_n=10)
+        self.process_sampler.start()
+        self.last_process_timestamp = None
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Start updating metrics
         self.update_metrics()
 
     def update_metrics(self):
         """
-        Fetches and updates system metrics in the GUI by calling functions from system_metrics.
+        Updates the labels from the sampler's latest snapshot. Never blocks on psutil.
         """
         try:
-            # CPU Usage
-            cpu_percent = system_metrics.get_cpu_usage()
-            self.cpu_label.config(text=f"{cpu_percent}%")
-
-            # Memory Usage
-            memory_info = system_metrics.get_memory_usage()
-            self.memory_label.config(text=f"{memory_info['percent']}% ({memory_info['used_gb']:.2f} GB / {memory_info['total_gb']:.2f} GB)")
-
-            # Disk Usage
-            disk_usage = system_metrics.get_disk_usage(self.disk_path)
-            self.disk_label.config(text=f"{disk_usage['percent']}% ({disk_usage['used_gb']:.2f} GB / {disk_usage['total_gb']:.2f} GB)")
-
-            # Network Activity
-            net_activity = system_metrics.get_network_activity()
-            self.net_sent_label.config(text=f"{net_activity['bytes_sent_gb']:.2f} GB")
-            self.net_recv_label.config(text=f"{net_activity['bytes_recv_gb']:.2f} GB")
+            error = self.sampler.last_error()
+            if error is not None:
+                # The sampler keeps retrying; report it without re-raising the same exception every refresh
+                self.status_label.config(text=f"Error sampling metrics: {error}")
+            else:
+                snapshot = self.sampler.snapshot()
+                if snapshot and snapshot["timestamp"] != self.last_timestamp:
+                    self.last_timestamp = snapshot["timestamp"]
+                    self.show_snapshot(snapshot)
+                    self.show_alerts()
 
-            # Update status label with current time for last update
-            import datetime
-            self.status_label.config(text=f"Last updated: {datetime.datetime.now().strftime('%H:%M:%S')}")
+            processes = self.process_sampler.snapshot()
+            if processes and processes["timestamp"] != self.last_process_timestamp:
+                self.last_process_timestamp = processes["timestamp"]
+                self.show_processes(processes)
 
         except Exception as e:
             self.status_label.config(text=f"Error updating metrics: {e}")
             print(f"Error updating metrics: {e}") # Log error to console
 
-        # Schedule the next update after 1000 milliseconds (1 second)
-        self.master.after(1000, self.update_metrics)
+        self.master.after(UI_REFRESH_MS, self.update_metrics)
+
+    def show_snapshot(self, snapshot):
+        """Writes one metrics snapshot into the labels and sparklines, timing the frame."""
+        with self.frame_timer:
+            self.render_snapshot(snapshot)
+            self.master.update_idletasks() # include the actual redraw in the measurement
+
+        # Update status label with the time the sample was taken and the render cost
+        sampled_at = datetime.datetime.fromtimestamp(snapshot['timestamp'])
+        mode = f"Replay {self.replay_speed:g}x" if self.replay_speed else "Last updated"
+        self.status_label.config(text=f"{mode}: {sampled_at.strftime('%H:%M:%S')}  |  "
+                                      f"render {self.frame_timer.last_ms:.2f} ms "
+                                      f"(avg {self.frame_timer.average_ms:.2f}, max {self.frame_timer.max_ms:.2f})")
+
+    def render_snapshot(self, snapshot):
+        """Updates every label and sparkline from a snapshot."""
+        # CPU Usage
+        self.cpu_label.config(text=f"{snapshot['cpu']}%")
+
+        # Memory Usage
+        memory_info = snapshot['memory']
+        self.memory_label.config(text=f"{memory_info['percent']}% ({memory_info['used_gb']:.2f} GB / {memory_info['total_gb']:.2f} GB)")
+
+        # Disk Usage
+        disk_usage = snapshot['disk']
+        self.disk_label.config(text=f"{disk_usage['percent']}% ({disk_usage['used_gb']:.2f} GB / {disk_usage['total_gb']:.2f} GB)")
+
+        # Network Activity (current rate, lifetime total)
+        net_activity = snapshot['network']
+        self.net_sent_label.config(text=f"{format_rate(net_activity['bytes_sent_per_s'])} ({net_activity['bytes_sent_gb']:.2f} GB total)")
+        self.net_recv_label.config(text=f"{format_rate(net_activity['bytes_recv_per_s'])} ({net_activity['bytes_recv_gb']:.2f} GB total)")
+
+        # Per-core CPU and disk I/O (read/write rate and IOPS)
+        cores = snapshot['cpu_per_core']
+        self.cores_label.config(text="  ".join(f"{value:.0f}%" for value in cores) if cores else "N/A")
+        disk_io = snapshot['disk_io']
+        self.disk_io_label.config(text=f"R {format_rate(disk_io['read_bytes_per_s'])} ({disk_io['read_count_per_s']:.0f} IOPS)  "
+                                       f"W {format_rate(disk_io['write_bytes_per_s'])} ({disk_io['write_count_per_s']:.0f} IOPS)")
+
+        # p95 CPU over the last 5 minutes
+        cpu_p95 = self.history.percentile("cpu", 95, 5 * 60)
+        if cpu_p95 is not None:
+            self.cpu_p95_label.config(text=f"{cpu_p95:.1f}%")
+
+        for metric, chart in self.sparklines.items():
+            chart.push(SNAPSHOT_FIELDS[metric](snapshot))
+
+    def show_alerts(self):
+        """Shows the banner while any alert rule is firing and hides it once all have resolved."""
+        active = self.alerts.active_alerts()
+        text = "  |  ".join(f"\u26a0 {event.message}" for event in active)
+        if text == self.alert_text:
+            return
+        self.alert_text = text
+        if text:
+            self.alert_banner.config(text=text)
+            self.alert_banner.pack(before=self.metrics_frame, padx=20, fill=tk.X)
+        else:
+            self.alert_banner.pack_forget()
+
+    def show_processes(self, processes):
+        """Fills the top-process table and reports what the last scan cost."""
+        rows = processes["processes"]
+        items = self.process_tree.get_children()
+        # Reuse the existing rows instead of deleting and re-inserting them
+        for index, row in enumerate(rows):
+            values = (row["pid"], row["name"], f"{row['cpu_percent']:.1f}", f"{row['rss_mb']:.1f}")
+            if index < len(items):
+                self.process_tree.item(items[index], values=values)
+            else:
+                self.process_tree.insert("", "end", values=values)
+        if len(items) > len(rows):
+            self.process_tree.delete(*items[len(rows):])
+        self.process_cost_label.config(
+            text=f"Scanned {processes['process_count']} processes in {processes['sample_ms']:.1f} ms, "
+                 f"next scan in {processes['interval']:.1f} s")
+
+    def on_close(self):
+        """Stops the background samplers and closes the window."""
+        self.process_sampler.stop()
+        self.sampler.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.master.destroy()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Real-time system monitor")
+    parser.add_argument("--record", metavar="FILE", help="Record every sample to a binary file")
+    parser.add_argument("--replay", metavar="FILE", help="Play back a recording instead of live metrics")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor (default: 1.0)")
+    parser.add_argument("--alert-log", default=ALERT_LOG, help=f"Alert event log (default: {ALERT_LOG})")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = SystemMonitorApp(root)
+    app = SystemMonitorApp(root, record_path=args.record, replay_path=args.replay, replay_speed=args.speed,
+                           alert_log=args.alert_log)
+    if event_loop_profiler is not None:
+        event_loop_profiler.profile_from_env(root)
     root.mainloop()
\ No newline at end of file
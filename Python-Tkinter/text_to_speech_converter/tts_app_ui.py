@@ -2,9 +2,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk  # Import Image and ImageTk for image handling
 import os  # Import os for path manipulation
+import sys
 
 from tts_logic import TextToSpeechEngine
 
+# Optional event-loop profiler shared by the Tkinter apps (run with TK_PROFILE=1 to enable)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tk_event_loop_profiler"))
+try:
+    import event_loop_profiler
+except ImportError:
+    event_loop_profiler = None
+
 
 class TextToSpeechApp:
     def __init__(self, master):
@@ -183,4 +191,6 @@ if __name__ == "__main__":
 
     root = tk.Tk()
     app = TextToSpeechApp(root)
+    if event_loop_profiler is not None:
+        event_loop_profiler.profile_from_env(root)
     root.mainloop()
@@ -0,0 +1,258 @@
+"""
+Measures how long a Tkinter app's main loop is blocked.
+
+Two measurements are taken on the Tk thread:
+
+- Heartbeat drift: a callback is scheduled with after(heartbeat_ms); how late it
+  runs is the time the loop was stalled by something else.
+- Callback latency: every Python callback Tk dispatches (button commands, after
+  timers, event bindings) is timed by wrapping tkinter.CallWrapper, so no app
+  code has to be changed. Extra functions can be timed with profiler.wrap().
+
+Results are shown in a small overlay in the window corner and/or written to a
+log file as p50/p99/max per callback.
+
+Usage:
+    profiler = EventLoopProfiler(root, overlay=True, log_path="tk_profile.log")
+    profiler.start()
+    root.mainloop()
+
+Or let the environment decide (TK_PROFILE=1, TK_PROFILE_LOG=path):
+    profile_from_env(root)
+"""
+import logging
+import math
+import os
+import time
+import tkinter as tk
+from collections import deque
+
+HEARTBEAT_MS = 50
+STALL_THRESHOLD_MS = 100.0
+REPORT_INTERVAL_MS = 1000
+WINDOW = 1000  # samples kept per series
+
+_active = None  # the running profiler, if any
+_original_call = tk.CallWrapper.__call__
+
+
+def percentile(values, percent):
+    """Returns the nearest-rank percentile (0-100) of values, or 0.0 if empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(len(ordered) * percent / 100.0), 1)
+    return ordered[rank - 1]
+
+
+def _unwrap(func):
+    # after() registers a local callit() that closes over the real callback
+    code = getattr(func, "__code__", None)
+    if code is not None and code.co_name == "callit" and "func" in code.co_freevars:
+        return func.__closure__[code.co_freevars.index("func")].cell_contents
+    return func
+
+
+def callback_name(func):
+    """Returns a readable name for a Tk callback, looking through after()'s callit wrapper."""
+    func = _unwrap(func)
+    return getattr(func, "__qualname__", None) or type(func).__qualname__
+
+
+def _internal(func):
+    func._profiler_internal = True
+    return func
+
+
+def _profiled_call(self, *args):
+    profiler = _active
+    if profiler is None:
+        return _original_call(self, *args)
+    target = _unwrap(self.func)
+    if getattr(target, "_profiler_internal", False):
+        return _original_call(self, *args)
+    start = time.perf_counter()
+    try:
+        return _original_call(self, *args)
+    finally:
+        profiler.record(callback_name(target), (time.perf_counter() - start) * 1000)
+
+
+# Misc._register binds CallWrapper(...).__call__ when a callback is registered,
+# not when it runs, so the hook has to be in place before the app creates its
+# widgets. It is therefore installed on import and only times calls while a
+# profiler is running; otherwise it just forwards to the original.
+tk.CallWrapper.__call__ = _profiled_call
+
+
+class EventLoopProfiler:
+    """
+    Heartbeat-drift and callback-latency profiler for one Tk root.
+
+    Only one profiler can run at a time, because the tkinter.CallWrapper hook
+    is shared by the whole process. Callbacks are only timed if they were
+    registered after this module was imported. Nested callbacks (e.g. events
+    handled inside update()) are also counted in their caller.
+    """
+
+    def __init__(self, root, heartbeat_ms=HEARTBEAT_MS, stall_threshold_ms=STALL_THRESHOLD_MS,
+                 window=WINDOW, overlay=True, log_path=None, report_interval_ms=REPORT_INTERVAL_MS):
+        """
+        Args:
+            root (tk.Tk): Window whose event loop is measured.
+            heartbeat_ms (int): Heartbeat period.
+            stall_threshold_ms (float): Drift or callback time reported as a stall.
+            window (int): Samples kept per series for the percentiles.
+            overlay (bool): Show the live overlay label in the top-right corner.
+            log_path (str or None): Append stalls and periodic reports to this file.
+            report_interval_ms (int): How often the overlay and log report are refreshed.
+        """
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_threshold_ms = stall_threshold_ms
+        self.window = window
+        self.report_interval_ms = report_interval_ms
+        self.drift = deque(maxlen=window)
+        self.callbacks = {}  # name -> deque of durations in ms
+        self.stalls = 0
+        self._expected = None
+        self._after_ids = []
+        self._overlay = None
+        if overlay:
+            self._overlay = tk.Label(root, text="profiling...", font=("Courier", 8), bg="#222222", fg="#00ff7f",
+                                     justify=tk.LEFT, anchor="ne", padx=4, pady=2)
+        self._logger = None
+        if log_path:
+            self._logger = logging.getLogger(f"event_loop_profiler.{log_path}")
+            if not self._logger.handlers:
+                handler = logging.FileHandler(log_path, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._logger.addHandler(handler)
+                self._logger.setLevel(logging.INFO)
+                self._logger.propagate = False
+
+    def start(self):
+        """Activates callback timing and starts the heartbeat and reports."""
+        global _active
+        if _active is not None and _active is not self:
+            raise RuntimeError("Another EventLoopProfiler is already running")
+        _active = self
+        if self._overlay is not None:
+            self._overlay.place(relx=1.0, rely=0.0, anchor="ne")
+            self._overlay.lift()
+        self._expected = time.perf_counter() + self.heartbeat_ms / 1000
+        self._after_ids = [self.root.after(self.heartbeat_ms, self._beat),
+                           self.root.after(self.report_interval_ms, self._report)]
+        return self
+
+    def stop(self):
+        """Stops callback timing, cancels the timers and logs a final report."""
+        global _active
+        for after_id in self._after_ids:
+            try:
+                self.root.after_cancel(after_id)
+            except tk.TclError:
+                pass
+        self._after_ids = []
+        if _active is self:
+            _active = None
+        if self._overlay is not None:
+            try:
+                self._overlay.place_forget()
+            except tk.TclError:
+                pass  # window already destroyed
+        self._log_report()
+
+    def wrap(self, name, func):
+        """Returns func timed under name, for work not dispatched by Tk itself."""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, (time.perf_counter() - start) * 1000)
+        return timed
+
+    def record(self, name, elapsed_ms):
+        """Adds one callback duration (called by the CallWrapper hook)."""
+        samples = self.callbacks.get(name)
+        if samples is None:
+            samples = self.callbacks[name] = deque(maxlen=self.window)
+        samples.append(elapsed_ms)
+        if elapsed_ms >= self.stall_threshold_ms:
+            self.stalls += 1
+            self._log(f"stall: {name} blocked the event loop for {elapsed_ms:.1f} ms")
+
+    def stats(self):
+        """
+        Returns the current figures:
+
+            drift      {"p50", "p99", "max"} heartbeat lateness in ms
+            callbacks  {name: {"count", "p50", "p99", "max"}} in ms
+            stalls     number of callbacks over stall_threshold_ms
+        """
+        drift = list(self.drift)
+        callbacks = {}
+        for name, samples in self.callbacks.items():
+            values = list(samples)
+            callbacks[name] = {"count": len(values), "p50": percentile(values, 50),
+                               "p99": percentile(values, 99), "max": max(values)}
+        return {"drift": {"p50": percentile(drift, 50), "p99": percentile(drift, 99),
+                          "max": max(drift) if drift else 0.0},
+                "callbacks": callbacks, "stalls": self.stalls}
+
+    def format_report(self, top=3):
+        """Returns a short text report: drift and the slowest callbacks by p99."""
+        stats = self.stats()
+        drift = stats["drift"]
+        lines = [f"loop drift p50 {drift['p50']:.1f} p99 {drift['p99']:.1f} max {drift['max']:.1f} ms"]
+        slowest = sorted(stats["callbacks"].items(), key=lambda item: item[1]["p99"], reverse=True)[:top]
+        for name, figures in slowest:
+            lines.append(f"{name[-28:]:<28} p50 {figures['p50']:.1f} p99 {figures['p99']:.1f} ms")
+        lines.append(f"stalls >= {self.stall_threshold_ms:.0f} ms: {stats['stalls']}")
+        return "\n".join(lines)
+
+    @_internal
+    def _beat(self):
+        now = time.perf_counter()
+        drift_ms = max((now - self._expected) * 1000, 0.0)
+        self.drift.append(drift_ms)
+        if drift_ms >= self.stall_threshold_ms:
+            self._log(f"stall: heartbeat ran {drift_ms:.1f} ms late")
+        self._expected = now + self.heartbeat_ms / 1000
+        self._after_ids[0] = self.root.after(self.heartbeat_ms, self._beat)
+
+    @_internal
+    def _report(self):
+        if self._overlay is not None:
+            self._overlay.config(text=self.format_report())
+            self._overlay.lift()
+        self._log_report()
+        self._after_ids[1] = self.root.after(self.report_interval_ms, self._report)
+
+    def _log_report(self):
+        if self._logger is None or not self.callbacks:
+            return
+        self._log(self.format_report(top=10).replace("\n", " | "))
+
+    def _log(self, message):
+        if self._logger is not None:
+            self._logger.info(message)
+
+
+def profile_from_env(root):
+    """
+    Starts a profiler if TK_PROFILE or TK_PROFILE_LOG is set, otherwise does nothing.
+
+    TK_PROFILE=1 shows the overlay; TK_PROFILE_LOG=path writes the log.
+
+    Returns:
+        EventLoopProfiler or None
+    """
+    overlay = os.environ.get("TK_PROFILE", "") not in ("", "0")
+    log_path = os.environ.get("TK_PROFILE_LOG") or None
+    if not overlay and not log_path:
+        return None
+    profiler = EventLoopProfiler(root, overlay=overlay, log_path=log_path)
+    root.bind("<Destroy>", lambda event: profiler.stop() if event.widget is root else None, add="+")
+    return profiler.start()
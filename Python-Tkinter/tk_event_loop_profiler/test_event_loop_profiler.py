@@ -0,0 +1,49 @@
+import tkinter as tk
+import unittest
+
+from event_loop_profiler import EventLoopProfiler
+
+
+class CallbackRegisteredBeforeStartTest(unittest.TestCase):
+    """Apps build their widgets before starting the profiler; those callbacks must still be timed."""
+
+    def setUp(self):
+        self.root = self.profiler = None
+
+    def tearDown(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.root is not None:
+            self.root.destroy()
+
+    def test_registered_command(self):
+        # A Tcl interpreter without Tk dispatches registered commands the same way and needs no display
+        root = tk.Tcl()
+        calls = []
+
+        def on_ping():
+            calls.append(True)
+
+        command = root.register(on_ping)
+        self.profiler = EventLoopProfiler(root, overlay=False).start()
+        root.tk.call(command)
+        self.assertEqual(calls, [True])
+        self.assertEqual(self.profiler.stats()["callbacks"][on_ping.__qualname__]["count"], 1)
+
+    def test_button_command(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"no display: {e}")
+
+        def on_click():
+            pass
+
+        button = tk.Button(self.root, command=on_click)
+        self.profiler = EventLoopProfiler(self.root, overlay=False).start()
+        button.invoke()
+        self.assertEqual(self.profiler.stats()["callbacks"][on_click.__qualname__]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()